@@ -5,24 +5,191 @@ Ogimet.com üzerinden METAR/TAF verilerini çeker.
 Requests + BeautifulSoup kullanır.
 """
 
+import re
+import html
+import time
+import asyncio
+import threading
+import weakref
 import requests
+from urllib.parse import urlsplit
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import ham_arsiv
+from ayarlar import OGIMET_BASE_URL
 
-def fetch(start_dt, end_dt, station="LTAN", wmo_id=None, timeout=30):
+# Toplu çekimde aynı anda açık tutulacak en fazla istek (Ogimet'i yormamak için sınırlı)
+MAX_WORKERS = 8
+
+# Ogimet genellikle 30-31 günlük veri verir; uzun aralıklar bu uzunlukta parçalara bölünür
+CHUNK_DAYS = 30
+# Tek istasyonun parçaları için aynı anda çalışacak en fazla istek
+CHUNK_WORKERS = 4
+
+# Uyarlanabilir pencere: Yanıt başına hedeflenen bülten sayısı ve en kısa pencere (gün)
+HEDEF_BULTEN = 1500
+MIN_WINDOW_DAYS = 1
+# Kesilmiş yanıt: En az bu kadar bülten gelmiş, en eski bülten başlangıçtan bu kadar sonra ve
+# bu boşluk yanıttaki en uzun bültensiz aradan (Örn: geceleri kapalı istasyon) da uzun ise
+KESIK_MIN_BULTEN = 100
+KESIK_TOLERANS = timedelta(hours=3)
+
+# Sunucu başına varsayılan limitler (Aynı anda en fazla istek / İstekler arası en az saniye)
+HOST_MAX_IN_FLIGHT = 8
+HOST_MIN_INTERVAL = 0.1
+
+METAR_URL = OGIMET_BASE_URL.rstrip("/") + "/display_metars2.php"
+SYNOP_URL = OGIMET_BASE_URL.rstrip("/") + "/display_synops2.php"
+
+# Tarayıcı gibi görünmek için Header
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+_session = None
+_session_lock = threading.Lock()
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# İstasyon başına gözlenen bülten yoğunluğu (bülten/gün, üstel ortalama)
+_yogunluk = {}
+_yogunluk_lock = threading.Lock()
+
+class EksikYanit(Exception):
     """
-    Ogimet.com üzerinden tarih aralığına göre verileri çeker.
+    raise_errors=True iken kesilmiş yanıtın kalan (eski) kısmı çekilemedi.
+    lines: elde edilen satırlar (Sınır dakikası hariç), eksik_bitis: bu dakika ve öncesi eksik.
     """
-    
-    # Hedef istasyon (ICAO öncelikli)
-    target = station if station else wmo_id
-    if not target: return []
-    
-    # Ogimet URL yapısı (display_metars2.php daha güvenilirdir)
-    url = "https://www.ogimet.com/display_metars2.php"
-    
-    # Parametreler
-    params = {
+    def __init__(self, lines, eksik_bitis):
+        super().__init__(f"Yanıt kesik, {eksik_bitis:%d.%m.%Y %H:%M} ve öncesi çekilemedi")
+        self.lines = lines
+        self.eksik_bitis = eksik_bitis
+
+def set_base_url(base_url):
+    """Ogimet yerine başka bir sunucu (örn. ogimet_sahte_sunucu.py) kullanmak için adresi değiştirir."""
+    global METAR_URL, SYNOP_URL
+    METAR_URL = base_url.rstrip("/") + "/display_metars2.php"
+    SYNOP_URL = base_url.rstrip("/") + "/display_synops2.php"
+
+def get_session():
+    """
+    Tüm isteklerin paylaştığı bağlantı havuzlu Session nesnesini döner.
+    Her istasyon için yeniden TCP+TLS kurulumu yapılmasını önler.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=MAX_WORKERS)
+                s.mount("https://", adapter)
+                s.mount("http://", adapter)
+                s.headers.update(HEADERS)
+                _session = s
+    return _session
+
+def _get_executor():
+    """METAR ve SYNOP isteklerini eşzamanlı göndermek için ortak iş parçacığı havuzu."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="ogimet")
+    return _executor
+
+# =============================================================================
+# SUNUCU BAŞINA İSTEK SINIRLAYICI
+# =============================================================================
+class HostLimiter:
+    """
+    Tek bir sunucuya aynı anda gidecek istek sayısını ve ardışık istekler
+    arasındaki en kısa süreyi sınırlar.
+
+    - Thread tarafı: `with limiter:` bloğu (fetch, fetch_many, fetch_chunks).
+    - asyncio tarafı: `async with limiter.async_slot():` (fetch_async).
+    İstek aralığı (min_interval) iki taraf arasında ortaktır; eşzamanlı istek
+    sınırı her taraf için ayrı ayrı uygulanır.
+    """
+    def __init__(self, max_in_flight=HOST_MAX_IN_FLIGHT, min_interval=HOST_MIN_INTERVAL):
+        self.max_in_flight = max_in_flight
+        self.min_interval = min_interval
+        self._sem = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self._async_sems = weakref.WeakKeyDictionary() # Her event loop için ayrı semafor
+
+    def _reserve(self):
+        """Sıradaki istek zamanını ayırır, beklenmesi gereken süreyi (sn) döner."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+            return slot - now
+
+    def __enter__(self):
+        self._sem.acquire()
+        wait = self._reserve()
+        if wait > 0: time.sleep(wait)
+        return self
+
+    def __exit__(self, *exc):
+        self._sem.release()
+        return False
+
+    def async_slot(self):
+        return _AsyncSlot(self)
+
+class _AsyncSlot:
+    def __init__(self, limiter):
+        self.limiter = limiter
+        self.sem = None
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        sems = self.limiter._async_sems
+        if loop not in sems:
+            sems[loop] = asyncio.Semaphore(self.limiter.max_in_flight)
+        self.sem = sems[loop]
+        await self.sem.acquire()
+        wait = self.limiter._reserve()
+        if wait > 0: await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, *exc):
+        self.sem.release()
+        return False
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def get_limiter(url):
+    """URL'nin ait olduğu sunucu için ortak HostLimiter nesnesini döner."""
+    host = urlsplit(url).netloc
+    with _limiters_lock:
+        if host not in _limiters:
+            _limiters[host] = HostLimiter()
+        return _limiters[host]
+
+def set_host_limits(url, max_in_flight=None, min_interval=None):
+    """Bir sunucunun eşzamanlı istek ve istek aralığı limitlerini değiştirir."""
+    old = get_limiter(url)
+    limiter = HostLimiter(
+        max_in_flight if max_in_flight is not None else old.max_in_flight,
+        min_interval if min_interval is not None else old.min_interval,
+    )
+    with _limiters_lock:
+        _limiters[urlsplit(url).netloc] = limiter
+    return limiter
+
+# =============================================================================
+# İSTEK PARAMETRELERİ VE YANIT AYRIŞTIRMA
+# =============================================================================
+def _build_params(start_dt, end_dt, target):
+    """Ogimet sorgu parametrelerini oluşturur."""
+    return {
         "lang": "en",
         "lugar": target,
         "tipo": "ALL",  # METAR ve TAF
@@ -41,62 +208,391 @@ def fetch(start_dt, end_dt, station="LTAN", wmo_id=None, timeout=30):
         "minf": f"{end_dt.minute:02d}",
         "send": "send"
     }
-    
+
+def _synop_params(params, wmo_id):
+    params_synop = params.copy()
+    params_synop["lugar"] = wmo_id
+    params_synop["fmt"] = "txt"
+    return params_synop
+
+_RE_PRE = re.compile(rb'<pre\b[^>]*>(.*?)</pre\s*>', re.I | re.S)
+_RE_ETIKET = re.compile(rb'<!--.*?-->|<[^>]*>', re.S)
+
+def _pre_metinleri(content, encoding="utf-8"):
+    """
+    Hızlı yol: <pre> bloklarını ham byte'lar üzerinde tek regex taramasıyla bulur,
+    blok içindeki etiketleri siler ve HTML entity'lerini çözer.
+    Sayfa düzeni tanınmazsa (hiç <pre> yok, iç içe veya kapanmamış <pre>) None döner.
+    """
+    if isinstance(content, str):
+        content, encoding = content.encode("utf-8"), "utf-8"
+
+    blocks = _RE_PRE.findall(content)
+    if not blocks or content.lower().count(b"<pre") != len(blocks):
+        return None
+
+    texts = []
+    for block in blocks:
+        if b"<" in block:
+            block = _RE_ETIKET.sub(b"", block)
+        text = block.decode(encoding, errors="replace")
+        texts.append(html.unescape(text) if "&" in text else text)
+    return texts
+
+def _parse_metar_page(content, encoding="utf-8", hizli=True):
+    """
+    display_metars2.php HTML yanıtındaki <pre> bloklarından veri satırlarını çıkarır.
+    Önce hızlı yol denenir; BeautifulSoup yalnızca sayfa düzeni tanınmazsa
+    (veya hizli=False ile karşılaştırma için) kullanılır.
+    """
+    texts = _pre_metinleri(content, encoding) if hizli else None
+
+    if texts is None:
+        text = content.decode(encoding, errors="replace") if isinstance(content, bytes) else content
+        soup = BeautifulSoup(text, "html.parser")
+        pres = soup.find_all("pre")
+
+        if not pres:
+            print("DEBUG: UYARI - HTML içinde <pre> etiketi bulunamadı (Veri yok veya format değişmiş).")
+            # Hata ayıklama için yanıtın başını yazdır
+            print(f"DEBUG: Yanıt Başlangıcı: {text[:200]}...")
+
+        texts = [pre.get_text() for pre in pres]
+
+    lines = []
+    for text in texts:
+        lines.extend(text.splitlines())
+
+    print(f"DEBUG: Toplam {len(lines)} satır veri çekildi.")
+    data = []
+    for l in lines:
+        l = l.strip()
+        if l and not l.startswith("#"):
+            data.append(l)
+    return data
+
+def _parse_synop_text(text):
+    """display_synops2.php metin yanıtından veri satırlarını çıkarır."""
+    data = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            data.append(line)
+    return data
+
+_RE_SATIR_ZAMANI = re.compile(r'^(\d{12})\b')
+
+def _bulten_zamanlari(lines):
+    """Ogimet satırlarının başındaki YYYYMMDDHHMM damgalarını datetime listesi olarak döner."""
+    zamanlar = []
+    for line in lines:
+        m = _RE_SATIR_ZAMANI.match(line)
+        if m:
+            try: zamanlar.append(datetime.strptime(m.group(1), "%Y%m%d%H%M"))
+            except ValueError: pass
+    return zamanlar
+
+def _yogunluk_guncelle(target, start_dt, end_dt, zamanlar):
+    """Gelen bülten sayısından istasyonun günlük bülten yoğunluğunu günceller."""
+    if not zamanlar: return
+    # Kesilmiş yanıtta yalnızca gerçekten kapsanan kısım hesaba katılır
+    span = (end_dt - max(start_dt, min(zamanlar))).total_seconds() / 86400
+    if span < 1: return # Kısa pencereler güvenilir tahmin vermez
+    oran = len(zamanlar) / span
+    with _yogunluk_lock:
+        eski = _yogunluk.get(target)
+        _yogunluk[target] = oran if eski is None else 0.7 * eski + 0.3 * oran
+
+def _kesik_kalan(zamanlar, start_dt, end_dt):
+    """
+    Yanıt kesilmiş görünüyorsa eksik kalan aralığın bitişini döner, aksi halde None.
+    Ogimet yeniden eskiye sıraladığı için kesilen kısım her zaman en eski bültenlerdir.
+    Baştaki boşluk, istasyonun yanıt içinde zaten verdiği en uzun aradan kısaysa (Gece kapalı
+    istasyon, pencere kapalı saatlerde başlıyor) kesilme sayılmaz.
+    """
+    if len(zamanlar) < KESIK_MIN_BULTEN: return None
+    sirali = sorted(zamanlar)
+    en_eski = sirali[0]
+    bosluk = en_eski - start_dt
+    if bosluk <= KESIK_TOLERANS or en_eski >= end_dt: return None
+    if bosluk <= max(b - a for a, b in zip(sirali, sirali[1:])): return None
+    return en_eski
+
+def _kesik_kuyrugu_at(lines, en_eski):
+    """
+    Kesilmiş yanıtın sonundaki (en eski dakikaya ait, yarım kalmış olabilecek) bültenleri atar.
+    Bu dakika kalan aralık isteğinde tekrar ve eksiksiz çekilir.
+    """
+    damga = en_eski.strftime("%Y%m%d%H%M")
+    for i, line in enumerate(lines):
+        if line.startswith(damga):
+            return lines[:i]
+    return lines
+
+def _kalanla_birlestir(lines, en_eski, kalan):
+    """
+    Kalan aralık yanıtını kesilmiş yanıta ekler. Kalan aralık en eski dakikayı da kapsadığı için
+    başarılı bir yanıtta en az bir bülten bulunur; bülten gelmediyse (İstek başarısız) sınır
+    dakikasındaki bültenler atılmaz, kesik yanıt olduğu gibi döner.
+    """
+    if not _bulten_zamanlari(kalan):
+        print(f"DEBUG: Kalan aralık çekilemedi, kesik yanıt olduğu gibi kullanılıyor ({en_eski.strftime('%d.%m.%Y %H:%M')} öncesi eksik).")
+        return lines
+    return _kesik_kuyrugu_at(lines, en_eski) + kalan
+
+def plan_adaptive(station, start_dt, end_dt):
+    """
+    İstasyonun gözlenen bülten yoğunluğuna göre pencere planı çıkarır.
+    SPECI yoğun istasyonlar daha kısa, sakin istasyonlar CHUNK_DAYS'e kadar uzun pencerelerle çekilir.
+    Yoğunluk henüz bilinmiyorsa sabit CHUNK_DAYS planı kullanılır.
+    CHUNK_DAYS bilinçli bir üst sınırdır: Ogimet tek sorguda en fazla ~30-31 günlük veri verdiği için
+    sakin istasyonlar bundan uzun pencerelerde birleştirilmez (Yalnızca yoğun istasyonlar bölünür).
+    """
+    with _yogunluk_lock:
+        oran = _yogunluk.get(station)
+    days = CHUNK_DAYS
+    if oran:
+        days = min(CHUNK_DAYS, max(MIN_WINDOW_DAYS, HEDEF_BULTEN / oran))
+    return plan_chunks(start_dt, end_dt, days=days)
+
+def _response_encoding(response):
+    """response.text ile aynı karakter kodlamasını döner (Metni tekrar çözmeden)."""
+    return response.encoding or response.apparent_encoding or "utf-8"
+
+def _arsivle(url, params, response):
+    """Yanıtı ham arşive yazar (Arşiv hatası veri çekmeyi bozmaz)."""
+    if ham_arsiv.aktif_mi():
+        try:
+            ham_arsiv.kaydet(url, params, response)
+        except Exception as e:
+            print(f"Ham arşiv yazma hatası: {e}")
+
+def _http_get(url, params, timeout):
+    """
+    Ortak Session üzerinden, sunucu limitlerine uyarak GET isteği yapar.
+    Replay modunda yanıt ağa çıkmadan ham arşivden okunur.
+    """
+    if ham_arsiv.replay_mi():
+        return ham_arsiv.yukle(url, params)
+    with get_limiter(url):
+        response = get_session().get(url, params=params, timeout=timeout, verify=False)
+    _arsivle(url, params, response)
+    return response
+
+def fetch(start_dt, end_dt, station="LTAN", wmo_id=None, timeout=30, raise_errors=False, include_synop=True):
+    """
+    Ogimet.com üzerinden tarih aralığına göre verileri çeker.
+    wmo_id verilirse METAR/TAF ve SYNOP istekleri eşzamanlı gönderilir;
+    include_synop=False ile SYNOP isteği hiç yapılmaz.
+    raise_errors=True ise ağ/sunucu hataları boş liste yerine istisna olarak yükseltilir
+    ("Veri yok" ile "çekilemedi" durumunu ayırması gereken çağıranlar için). Bu durumda kesilmiş
+    yanıtın kalan kısmı çekilemezse elde edilen satırlar EksikYanit ile yükseltilir.
+    """
+
+    # Hedef istasyon (ICAO öncelikli)
+    target = station if station else wmo_id
+    if not target: return []
+
+    # Ogimet URL yapısı (display_metars2.php daha güvenilirdir)
+    url = METAR_URL
+
+    # Parametreler
+    params = _build_params(start_dt, end_dt, target)
+
     print(f"DEBUG: Ogimet İsteği Başlatılıyor -> {target} ({start_dt.strftime('%d.%m.%Y')} - {end_dt.strftime('%d.%m.%Y')})")
-    
-    # Tarayıcı gibi görünmek için Header ekle
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    
+
+    # SYNOP isteği arka planda hemen başlatılır, METAR/TAF bu thread'de çekilir
+    synop_future = None
+    if wmo_id and include_synop:
+        synop_future = _get_executor().submit(_http_get, SYNOP_URL, _synop_params(params, wmo_id), timeout)
+
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=timeout, verify=False)
-        print(f"DEBUG: Sunucu Yanıt Kodu: {response.status_code} | İçerik Boyutu: {len(response.text)} byte")
-        
+        response = _http_get(url, params, timeout)
+        print(f"DEBUG: Sunucu Yanıt Kodu: {response.status_code} | İçerik Boyutu: {len(response.content)} byte")
+
         if response.status_code != 200:
             print(f"HATA: Ogimet sunucusu {response.status_code} kodu döndü.")
+            if synop_future: synop_future.cancel()
+            if raise_errors: raise requests.HTTPError(f"Ogimet HTTP {response.status_code}", response=response)
             return []
-            
+
         # HTML yanıtını ayrıştır
-        soup = BeautifulSoup(response.text, "html.parser")
-        
-        lines = []
-        pres = soup.find_all("pre")
-        
-        if not pres:
-            print("DEBUG: UYARI - HTML içinde <pre> etiketi bulunamadı (Veri yok veya format değişmiş).")
-            # Hata ayıklama için yanıtın başını yazdır
-            print(f"DEBUG: Yanıt Başlangıcı: {response.text[:200]}...")
-            
-        for pre in pres:
-            lines.extend(pre.get_text().splitlines())
-
-        print(f"DEBUG: Toplam {len(lines)} satır veri çekildi.")
-        data = []
-        for l in lines:
-            l = l.strip()
-            if l and not l.startswith("#"):
-                data.append(l)
-            
+        data = _parse_metar_page(response.content, _response_encoding(response))
+
+        # Kesilmiş yanıt kontrolü: Eksik kalan eski kısım ayrı istekle (gerekirse tekrar bölünerek) çekilir
+        zamanlar = _bulten_zamanlari(data)
+        _yogunluk_guncelle(target, start_dt, end_dt, zamanlar)
+        kalan_bitis = _kesik_kalan(zamanlar, start_dt, end_dt)
+        if kalan_bitis:
+            print(f"DEBUG: Yanıt kesilmiş görünüyor ({len(zamanlar)} bülten). Kalan aralık çekiliyor: {start_dt.strftime('%d.%m.%Y %H:%M')} - {kalan_bitis.strftime('%d.%m.%Y %H:%M')}")
+            eksik_bitis = None
+            try:
+                kalan = fetch(start_dt, kalan_bitis, station=target, timeout=timeout, raise_errors=raise_errors, include_synop=False)
+            except EksikYanit as e: # Kalan aralık da kesik geldi; ondan eskisi eksik
+                kalan, eksik_bitis = e.lines, e.eksik_bitis
+            if raise_errors and not _bulten_zamanlari(kalan):
+                # Kalan aralık boş döndü (Kota/tanınmayan sayfa): yarım olabilecek sınır dakikası atılır
+                print(f"DEBUG: Kalan aralık çekilemedi ({kalan_bitis.strftime('%d.%m.%Y %H:%M')} öncesi eksik).")
+                data, eksik_bitis = _kesik_kuyrugu_at(data, kalan_bitis), kalan_bitis
+            else:
+                data = _kalanla_birlestir(data, kalan_bitis, kalan)
+
         # --- SYNOP VERİLERİ (Eksik Kısım Eklendi) ---
-        if wmo_id:
+        if synop_future:
             try:
-                url_synop = "https://www.ogimet.com/display_synops2.php"
-                params_synop = params.copy()
-                params_synop["lugar"] = wmo_id
-                params_synop["fmt"] = "txt"
-                r2 = requests.get(url_synop, params=params_synop, headers=headers, timeout=timeout, verify=False)
-                
+                r2 = synop_future.result()
+
                 if r2.ok:
-                    for line in r2.text.splitlines():
-                        line = line.strip()
-                        if line and not line.startswith("#"):
-                            data.append(line)
+                    data.extend(_parse_synop_text(r2.text))
+                elif raise_errors:
+                    raise requests.HTTPError(f"Ogimet SYNOP HTTP {r2.status_code}", response=r2)
             except Exception as e:
                 print(f"Ogimet SYNOP çekme hatası: {e}")
+                if raise_errors: raise
 
+        if kalan_bitis and eksik_bitis:
+            raise EksikYanit(data, eksik_bitis)
         return data
 
+    except EksikYanit:
+        raise
+    except Exception as e:
+        if synop_future: synop_future.cancel()
+        print(f"Ogimet veri çekme hatası: {e}")
+        if raise_errors: raise
+        return []
+
+def fetch_many(stations, start_dt, end_dt, timeout=30, max_workers=MAX_WORKERS, fetch_func=None, **kwargs):
+    """
+    Birden fazla istasyonu ortak Session ve sınırlı bir iş parçacığı havuzu ile çeker.
+    Sonuçları tamamlandıkça (istasyon, satırlar) ikilisi olarak üretir (generator).
+
+    fetch_func verilirse her istasyon için fetch yerine o çağrılır
+    (Aynı imza: fetch_func(start_dt, end_dt, station=..., timeout=..., **kwargs)).
+    Ek anahtar argümanlar (örn. include_synop=False) her çağrıya aktarılır.
+    """
+    func = fetch_func or fetch
+    stations = list(stations)
+    if not stations: return
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(stations)))
+    try:
+        futures = {executor.submit(func, start_dt, end_dt, station=code, timeout=timeout, **kwargs): code for code in stations}
+        for fut in as_completed(futures):
+            code = futures[fut]
+            try:
+                lines = fut.result()
+            except Exception as e:
+                print(f"Ogimet toplu çekme hatası ({code}): {e}")
+                lines = []
+            yield code, lines
+    finally:
+        # Erken çıkışta (tarama durdurulursa) bekleyen istekleri iptal et
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def plan_chunks(start_dt, end_dt, days=CHUNK_DAYS):
+    """Uzun bir aralığı yeniden eskiye sıralı parçalara böler: [(başlangıç, bitiş), ...]."""
+    chunks = []
+    curr_end = end_dt
+    while curr_end > start_dt:
+        curr_start = max(curr_end - timedelta(days=days), start_dt)
+        chunks.append((curr_start, curr_end))
+        curr_end = curr_start - timedelta(seconds=1)
+    return chunks
+
+def fetch_chunks(chunks, station, wmo_id=None, timeout=30, max_workers=CHUNK_WORKERS, fetch_func=None, on_progress=None):
+    """
+    Parça planını sınırlı paralellikle çeker ve satırları plan sırasıyla birleştirip döner.
+    İstekler arası aralık ortak HostLimiter tarafından korunur.
+    on_progress(tamamlanan, toplam, (başlangıç, bitiş)) her parça bittiğinde çağrılır.
+    """
+    func = fetch_func or fetch
+    if not chunks: return []
+
+    results = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks))) as executor:
+        futures = {executor.submit(func, c_start, c_end, station=station, wmo_id=wmo_id, timeout=timeout): i
+                   for i, (c_start, c_end) in enumerate(chunks)}
+        for done, fut in enumerate(as_completed(futures), 1):
+            i = futures[fut]
+            try:
+                results[i] = fut.result() or []
+            except Exception as e:
+                print(f"Veri parça hatası: {e}")
+                results[i] = []
+            if on_progress: on_progress(done, len(chunks), chunks[i])
+
+    all_lines = []
+    for lines in results:
+        all_lines.extend(lines)
+    return all_lines
+
+# =============================================================================
+# ASYNCIO İSTEMCİSİ
+# =============================================================================
+async def _http_get_async(url, params, timeout):
+    """
+    Sunucu limitine göre sıraya girer; yalnızca sıra gelen istek bir thread'e verilir.
+    Böylece yüzlerce istasyon beklerken thread sayısı limit kadar kalır.
+    """
+    if ham_arsiv.replay_mi():
+        return ham_arsiv.yukle(url, params)
+    async with get_limiter(url).async_slot():
+        response = await asyncio.to_thread(get_session().get, url, params=params, timeout=timeout, verify=False)
+    _arsivle(url, params, response)
+    return response
+
+async def fetch_async(start_dt, end_dt, station="LTAN", wmo_id=None, timeout=30, include_synop=True):
+    """
+    fetch fonksiyonunun asyncio karşılığı (Scheduler veya Streamlit içinden await edilebilir).
+    METAR/TAF ve SYNOP istekleri birlikte gönderilir. Dönüş formatı fetch ile aynıdır.
+    """
+    target = station if station else wmo_id
+    if not target: return []
+
+    params = _build_params(start_dt, end_dt, target)
+
+    print(f"DEBUG: Ogimet (async) İsteği Başlatılıyor -> {target} ({start_dt.strftime('%d.%m.%Y')} - {end_dt.strftime('%d.%m.%Y')})")
+
+    with_synop = bool(wmo_id and include_synop)
+    tasks = [_http_get_async(METAR_URL, params, timeout)]
+    if with_synop:
+        tasks.append(_http_get_async(SYNOP_URL, _synop_params(params, wmo_id), timeout))
+
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    response = results[0]
+    if isinstance(response, Exception):
+        print(f"Ogimet veri çekme hatası: {response}")
+        return []
+    if response.status_code != 200:
+        print(f"HATA: Ogimet sunucusu {response.status_code} kodu döndü.")
+        return []
+
+    try:
+        data = _parse_metar_page(response.content, _response_encoding(response))
     except Exception as e:
         print(f"Ogimet veri çekme hatası: {e}")
         return []
+
+    zamanlar = _bulten_zamanlari(data)
+    _yogunluk_guncelle(target, start_dt, end_dt, zamanlar)
+    kalan_bitis = _kesik_kalan(zamanlar, start_dt, end_dt)
+    if kalan_bitis:
+        kalan = await fetch_async(start_dt, kalan_bitis, station=target, timeout=timeout, include_synop=False)
+        data = _kalanla_birlestir(data, kalan_bitis, kalan)
+
+    if with_synop:
+        r2 = results[1]
+        if isinstance(r2, Exception):
+            print(f"Ogimet SYNOP çekme hatası: {r2}")
+        elif r2.ok:
+            data.extend(_parse_synop_text(r2.text))
+
+    return data
+
+async def fetch_many_async(stations, start_dt, end_dt, timeout=30):
+    """Birden fazla istasyonu asyncio ile çeker. {istasyon: satırlar} sözlüğü döner."""
+    stations = list(stations)
+    results = await asyncio.gather(*(fetch_async(start_dt, end_dt, station=code, timeout=timeout) for code in stations))
+    return dict(zip(stations, results))
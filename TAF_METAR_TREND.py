@@ -1,5 +1,137 @@
 import re
+import threading
+from bisect import bisect_right
+from functools import wraps
+from operator import attrgetter
+from dataclasses import dataclass, field
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
+from bulten import Bulletin, metni
+from zaman_cozucu import en_yakin, adaylar, tarih_kur, TASMA
+from grup_cozucu import GrupCozucu
+
+# TAF trend bölücüsü: BECMG, TEMPO ve tek başına (Ardında TEMPO olmayan) PROB30/PROB40 grupları
+_RE_TREND_BOLUCU = re.compile(r'\b(BECMG|TEMPO|PROB\d{2}(?!\s+TEMPO\b))\b')
+
+def _onbellekli(func):
+    """
+    Ayrıştırma yardımcısını robotun LRU rapor önbelleğinden geçirir (Anahtar: yardımcı + argümanlar).
+    Dönen değerler çağrılar arasında paylaşılır, çağıran tarafından değiştirilmemelidir.
+    """
+    ad = func.__name__
+
+    @wraps(func)
+    def sarmal(self, *args):
+        key = (ad,) + args
+        with self._onbellek_kilidi:
+            if key in self._onbellek:
+                self._onbellek.move_to_end(key)
+                self.onbellek_isabet += 1
+                return self._onbellek[key]
+        sonuc = func(self, *args)
+        with self._onbellek_kilidi:
+            self.onbellek_iskalama += 1
+            self._onbellek[key] = sonuc
+            if len(self._onbellek) > self.onbellek_boyutu:
+                self._onbellek.popitem(last=False)
+        return sonuc
+    return sarmal
+
+# analiz_et neden metinlerinin kısa kodları (analiz_et_batch). İlk eşleşen önek geçerlidir.
+NEDEN_KODLARI = (
+    ("Rüzgar hızı", "RUZGAR_HIZ"),
+    ("Rüzgar yön", "RUZGAR_YON"),
+    ("Görüş değişimi", "GORUS"),
+    ("Tavan değişimi", "TAVAN"),
+    ("Dikey Görüş değişimi", "DIKEY_GORUS"),
+    ("Kritik hadise", "HADISE"),
+    ("BECMG bitişine", "BECMG_BITIS"),
+    ("TAF Trendi ile erken uyum", "TREND_TAMPON"),
+    ("TAF veya METAR verisi eksik", "VERI_EKSIK"),
+    ("METAR rüzgar", "METAR_RUZGAR_YOK"),
+    ("TAF rüzgar", "TAF_RUZGAR_YOK"),
+)
+
+def neden_kodlari(nedenler):
+    """Neden metinlerini tekrarsız kod listesine çevirir (Sıra korunur, tanınmayanlar DIGER)."""
+    kodlar = []
+    for n in nedenler:
+        kod = next((k for onek, k in NEDEN_KODLARI if n.startswith(onek)), "DIGER")
+        if kod not in kodlar: kodlar.append(kod)
+    return kodlar
+
+def _py(dt):
+    """pandas Timestamp'i datetime'a çevirir (Diğer değerler aynen döner)."""
+    return dt.to_pydatetime() if hasattr(dt, "to_pydatetime") else dt
+
+# =============================================================================
+# DERLENMİŞ TAF ZAMAN ÇİZELGESİ
+# =============================================================================
+@dataclass(slots=True)
+class TafDonemi:
+    """
+    Derlenmiş TAF'ta tek dönem: ana kısım, FM, BECMG veya TEMPO.
+    Tek başına PROB30/PROB40 DDHH/DDHH grupları da TEMPO dönemi olarak derlenir (Geçici olası koşul).
+    """
+    tur: str                # ANA, FM, BECMG, TEMPO
+    konum: int              # TAF metnindeki başlangıç konumu (Metin sırası)
+    baslangic: datetime     # None: Zaman grubu yok (Ana kısım veya zamansız trend)
+    bitis: datetime
+    degerler: tuple         # (Rüzgar, Görüş, Tavan, Hadise); trendlerde eksikler ana kısımdan. None: rüzgar okunamadı
+    olasilik: int = None    # PROB30/PROB40 (PROB TEMPO veya tek başına PROB); değerlendirmede TEMPO gibi işlenir
+
+    def aktif_mi(self, t, tampon_dk=0):
+        """Dönem t anında (± tampon) geçerli mi? (_is_trend_active kuralları)"""
+        if self.baslangic is None or t is None: return True
+        tampon = timedelta(minutes=tampon_dk)
+        if self.tur == 'TEMPO': return self.baslangic - tampon <= t <= self.bitis + tampon
+        if self.tur == 'BECMG': return t >= self.baslangic - tampon
+        return True
+
+@dataclass(slots=True)
+class TafBolumu:
+    """Ana kısımdan veya bir FM grubundan itibaren geçerli TAF bölümü ve trendleri."""
+    ana: TafDonemi
+    trendler: list          # Metin sırasıyla TafDonemi
+    _zamansiz: list = field(init=False, repr=False)
+    _zamanli: list = field(init=False, repr=False) # Başlangıca göre sıralı
+    _baslar: list = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self._zamansiz = [tr for tr in self.trendler if tr.baslangic is None]
+        self._zamanli = sorted((tr for tr in self.trendler if tr.baslangic is not None), key=attrgetter("baslangic"))
+        self._baslar = [tr.baslangic for tr in self._zamanli]
+
+    def trendler_at(self, t, tampon_dk=0):
+        """t anında (± tampon) geçerli trendleri metin sırasıyla döner. Zamansız trendler her zaman dahildir."""
+        if t is None: return self.trendler
+        i = bisect_right(self._baslar, t + timedelta(minutes=tampon_dk)) # Başlangıcı geçmiş olanlar
+        aktif = [tr for tr in self._zamanli[:i] if tr.aktif_mi(t, tampon_dk)] + self._zamansiz
+        aktif.sort(key=attrgetter("konum"))
+        return aktif
+
+@dataclass(slots=True)
+class TafCizelgesi:
+    """
+    TAF'ın bir kez derlenmiş hali (HavacilikRobotModulu.taf_derle).
+    bolumler[0] ana kısım, sonrakiler FM grupları (Metin sırası). donemler tüm dönemlerin metin sırasıyla listesi.
+    """
+    metin: str
+    yayin: datetime
+    bolumler: list
+    donemler: list
+    _fm_zamanlari: list = field(repr=False) # FM başlangıçları (Sıralı)
+    _fm_bolum: list = field(repr=False)     # _fm_zamanlari[:i+1] içinde metinde en sondaki FM'in bolumler indeksi
+
+    def bolum(self, t):
+        """t anında geçerli bölüm: başlamış FM gruplarından metinde en sondaki, yoksa ana kısım."""
+        i = bisect_right(self._fm_zamanlari, t)
+        return self.bolumler[self._fm_bolum[i - 1]] if i else self.bolumler[0]
+
+    def gecerli(self, t, tampon_dk=0):
+        """t anında (± tampon) geçerli (ana dönem, [trendler]) çiftini döner."""
+        b = self.bolum(t)
+        return b.ana, b.trendler_at(t, tampon_dk)
 
 # =============================================================================
 # HAVACILIK ROBOT MODÜLÜ (ANALİZ MOTORU)
@@ -33,8 +165,30 @@ class HavacilikRobotModulu:
        b. TAF Trend Kontrolü: Uyumsuzsa, BECMG/TEMPO gruplarına bakılır.
        c. METAR Trend Kontrolü: Hala uyumsuzsa, METAR sonundaki NOSIG/BECMG/TEMPO'ya bakılır.
        d. Uyumsuzluk: Hiçbiri uymuyorsa "UYUMSUZ" döner.
+
+    5. Rapor Önbelleği:
+       - Ayrıştırma yardımcıları sonuçlarını metne göre sınırlı bir LRU önbellekte tutar.
+         Bir TAF'ın yönettiği her METAR için TAF yeniden ayrıştırılmaz (onbellek_durumu()).
+
+    6. Derlenmiş TAF (taf_derle):
+       - TAF bir kez ana kısım, FM, BECMG ve TEMPO dönemlerine mutlak zamanlarıyla derlenir.
+       - METAR anındaki FM bölümü ve geçerli trendler ikili aramayla bulunur (TafCizelgesi.gecerli).
+
+    7. Grup Çözücü (hizli=True):
+       - Rapor tek geçişte sözcüklerine ayrılıp biçimine göre sınıflandırılır (grup_cozucu).
+       - hizli=False ile _parse_* regex yardımcıları kullanılır (Karşılaştırma için).
     """
-    def __init__(self):
+    ONBELLEK_BOYUTU = 50000 # Yardımcı+metin kaydı (~10 bin bülten)
+
+    def __init__(self, onbellek_boyutu=ONBELLEK_BOYUTU, hizli=True):
+        self.onbellek_boyutu = onbellek_boyutu
+        self.hizli = hizli
+        self._cozucu = None
+        self._onbellek = OrderedDict()
+        self._onbellek_kilidi = threading.Lock() # Arka plan taraması ve işçi thread'leri aynı robotu kullanır
+        self.onbellek_isabet = 0
+        self.onbellek_iskalama = 0
+
         self.esikler_ruyet = [150, 350, 600, 800, 1500, 3000, 5000]
         self.esikler_tavan = [100, 200, 500, 1000, 1500]
         self.esikler_vv = [100, 200, 500, 1000]
@@ -58,20 +212,32 @@ class HavacilikRobotModulu:
         print(f"Kritik Hadiseler (Regex): {self.kritik_hadiseler}")
         print("-----------------------------------")
 
+    def onbellek_durumu(self):
+        """Rapor önbelleği istatistiklerini sözlük olarak döner."""
+        toplam = self.onbellek_isabet + self.onbellek_iskalama
+        return {"kayit": len(self._onbellek), "boyut": self.onbellek_boyutu, "isabet": self.onbellek_isabet,
+                "iskalama": self.onbellek_iskalama, "oran": self.onbellek_isabet / toplam if toplam else 0.0}
+
+    def onbellek_temizle(self):
+        """Önbelleği ve sayaçları sıfırlar (Eşikler/kritik hadiseler/hizli değiştirilirse çağrılmalı)."""
+        with self._onbellek_kilidi:
+            self._onbellek.clear()
+            self._cozucu = None
+            self.onbellek_isabet = self.onbellek_iskalama = 0
+
     def _resolve_dt(self, day, hour, minute, ref_date):
         """DDHHMM formatındaki zamanı referans tarihe göre datetime objesine çevirir."""
-        candidates = []
-        for offset in [-1, 0, 1]:
-            y, m = ref_date.year, ref_date.month + offset
-            if m < 1: m += 12; y -= 1
-            elif m > 12: m -= 12; y += 1
-            try:
-                base = datetime(y, m, 1)
-                dt = base + timedelta(days=day-1, hours=hour, minutes=minute)
-                candidates.append(dt)
-            except: continue
-        if not candidates: return None
-        return min(candidates, key=lambda x: abs(x - ref_date))
+        return en_yakin(day, hour, minute, ref_date, TASMA)
+
+    def _donem_sinirlari(self, ts_d, ts_h, te_d, te_h, ref_date):
+        """DDHH/DDHH dönemini ref_date'e en yakın başlangıçla (t_start, t_end) olarak çözer. Çözülemezse None."""
+        t_start = en_yakin(ts_d, ts_h, 0, ref_date, TASMA)
+        if t_start is None: return None
+        y_end, m_end = t_start.year, t_start.month
+        if te_d < ts_d: # Gün devri (Ay sonu)
+            m_end += 1
+            if m_end > 12: m_end = 1; y_end += 1
+        return t_start, tarih_kur(y_end, m_end, te_d, te_h)
 
     def zaman_uygun_mu(self, taf_header, metar_time_code, ref_date=None):
         """
@@ -95,43 +261,13 @@ class HavacilikRobotModulu:
             now = ref_date if ref_date else datetime.utcnow()
             now = ref_date if ref_date else datetime.now(timezone.utc).replace(tzinfo=None)
             
-            def safe_dt(y, m, d, h, minute=0):
-                # Ayın 1'inden başlayıp gün ekleyerek tarih oluştur (Ay sonu taşmalarını önler)
-                base = datetime(y, m, 1)
-                return base + timedelta(days=d-1, hours=h, minutes=minute)
-
-            # TAF Başlangıç (En yakın tarih tahmini)
-            candidates = []
-            for offset in [-1, 0, 1]:
-                y, m = now.year, now.month + offset
-                if m < 1: m += 12; y -= 1
-                elif m > 12: m -= 12; y += 1
-                try:
-                    candidates.append(safe_dt(y, m, ts_d, ts_h))
-                except: continue
-            
-            if not candidates: return False
-            t_start = min(candidates, key=lambda x: abs(x - now))
-            
-            # TAF Bitiş
-            y_end, m_end = t_start.year, t_start.month
-            if te_d < ts_d: # Gün devri (Ay sonu)
-                m_end += 1
-                if m_end > 12: m_end = 1; y_end += 1
-            
-            t_end = safe_dt(y_end, m_end, te_d, te_h)
+            # TAF Başlangıç/Bitiş (En yakın tarih tahmini, ay sonu taşmalı)
+            sinirlar = self._donem_sinirlari(ts_d, ts_h, te_d, te_h, now)
+            if sinirlar is None: return False
+            t_start, t_end = sinirlar
             
             # METAR (TAF aralığına giren aday)
-            m_candidates = []
-            for offset in [-1, 0, 1]:
-                y, m = t_start.year, t_start.month + offset
-                if m < 1: m += 12; y -= 1
-                elif m > 12: m -= 12; y += 1
-                try:
-                    m_candidates.append(safe_dt(y, m, m_d, m_h, m_m))
-                except: continue
-                
-            for m_dt in m_candidates:
+            for m_dt in adaylar(t_start.year, t_start.month, m_d, m_h, m_m, TASMA):
                 if t_start <= m_dt <= t_end:
                     return True
                     
@@ -158,43 +294,14 @@ class HavacilikRobotModulu:
             now = ref_date if ref_date else datetime.utcnow()
             now = ref_date if ref_date else datetime.now(timezone.utc).replace(tzinfo=None)
             
-            def safe_dt(y, m, d, h, minute=0):
-                base = datetime(y, m, 1)
-                return base + timedelta(days=d-1, hours=h, minutes=minute)
-
-            # Trend Başlangıç
-            candidates = []
-            for offset in [-1, 0, 1]:
-                y, m = now.year, now.month + offset
-                if m < 1: m += 12; y -= 1
-                elif m > 12: m -= 12; y += 1
-                try:
-                    candidates.append(safe_dt(y, m, ts_d, ts_h))
-                except: continue
-            
-            if not candidates: return True
-            t_start = min(candidates, key=lambda x: abs(x - now))
-            
-            # Trend Bitiş
-            y_end, m_end = t_start.year, t_start.month
-            if te_d < ts_d: 
-                m_end += 1
-                if m_end > 12: m_end = 1; y_end += 1
-            
-            t_end = safe_dt(y_end, m_end, te_d, te_h)
+            # Trend Başlangıç/Bitiş
+            sinirlar = self._donem_sinirlari(ts_d, ts_h, te_d, te_h, now)
+            if sinirlar is None: return True
+            t_start, t_end = sinirlar
             
             # METAR Zamanı
-            m_candidates = []
-            for offset in [-1, 0, 1]:
-                y, m = t_start.year, t_start.month + offset
-                if m < 1: m += 12; y -= 1
-                elif m > 12: m -= 12; y += 1
-                try:
-                    m_candidates.append(safe_dt(y, m, m_d, m_h, m_m))
-                except: continue
-            
-            if not m_candidates: return True
-            m_dt = min(m_candidates, key=lambda x: abs(x - t_start))
+            m_dt = en_yakin(m_d, m_h, m_m, t_start, TASMA)
+            if m_dt is None: return True
 
             # Buffer Uygulama
             t_start_buf = t_start - timedelta(minutes=buffer_minutes)
@@ -216,6 +323,7 @@ class HavacilikRobotModulu:
             if low < t <= high: return True
         return False
 
+    @_onbellekli
     def _parse_wind(self, code):
         """Metin içinden rüzgar yönü, hızı ve hamlesini (gust) ayıklar."""
         # Önce Gust ve KT içeren tam formatı dene
@@ -235,6 +343,7 @@ class HavacilikRobotModulu:
             
         return None
 
+    @_onbellekli
     def _parse_ceiling(self, code):
         """Metin içinden bulut tavanını (Ceiling) veya Dikey Görüşü (VV) ayıklar."""
         if any(x in code for x in ['CAVOK', 'SKC', 'NSC', 'CLR']):
@@ -249,6 +358,7 @@ class HavacilikRobotModulu:
             
         return None
 
+    @_onbellekli
     def _parse_cloud_layers(self, code):
         """Tüm bulut katmanlarını (Tip, Yükseklik) listesi olarak döner."""
         layers = []
@@ -257,6 +367,7 @@ class HavacilikRobotModulu:
             layers.append((m[0], int(m[1])*100))
         return layers
 
+    @_onbellekli
     def _parse_visibility(self, code):
         """Metin içinden görüş mesafesini (Visibility) ayıklar."""
         if 'CAVOK' in code:
@@ -268,6 +379,7 @@ class HavacilikRobotModulu:
             
         return None
 
+    @_onbellekli
     def _parse_weather(self, code):
         """Metin içindeki kritik hava hadiselerini (Weather) ayıklar."""
         if 'NSW' in code:
@@ -283,6 +395,21 @@ class HavacilikRobotModulu:
         
         return found if found else None
 
+    @_onbellekli
+    def _gruplar(self, text):
+        """Metni grup_cozucu ile tek geçişte çözer (RaporGruplari)."""
+        cozucu = self._cozucu
+        if cozucu is None:
+            cozucu = self._cozucu = GrupCozucu(self.kritik_hadiseler)
+        return cozucu.coz(text)
+
+    def _degerler(self, code):
+        """Metnin (Rüzgar, Görüş, Tavan, Hadise) değerleri; bulunamayanlar None."""
+        if self.hizli:
+            return self._gruplar(code).degerler
+        return self._parse_wind(code), self._parse_visibility(code), self._parse_ceiling(code), self._parse_weather(code)
+
+    @_onbellekli
     def _extract_body(self, text):
         """Rapor metnini rüzgar grubundan itibaren alır (Başlıkları ve zamanı atlar)."""
         # Rüzgar deseni: 3 hane yön (veya VRB) + 2/3 hane hız + (opsiyonel G + hamle) + KT
@@ -291,6 +418,33 @@ class HavacilikRobotModulu:
             return text[match.start():]
         return text
 
+    @_onbellekli
+    def _metar_degerleri(self, metar_body):
+        """METAR gövdesinden (Rüzgar, Görüş, Tavan, Hadise) döner. Rüzgar okunamazsa None."""
+        m_wind, m_vis, m_cig, m_wx = self._degerler(metar_body)
+        if m_wind is None: return None
+        
+        if m_vis is None: m_vis = 10000
+        if m_cig is None: m_cig = (9999, False)
+        if m_wx is None: m_wx = set() # METAR'da hadise yoksa boş set
+        
+        return (m_wind, m_vis, m_cig, m_wx)
+
+    def _trend_degerleri(self, trend_raw, metar_vals):
+        """METAR trendinin değerleri; trendde olmayanlar METAR'dan alınır (Persistence)."""
+        m_wind, m_vis, m_cig, m_wx = metar_vals
+        w, v, c, wx = self._degerler(trend_raw)
+        return (w if w is not None else m_wind, v if v is not None else m_vis,
+                c if c is not None else m_cig, wx if wx is not None else m_wx)
+
+    @_onbellekli
+    def _main_part(self, text):
+        """TAF gövdesinin ana kısmını (İlk BECMG/TEMPO/PROB/FM grubuna kadar) döner."""
+        if self.hizli:
+            k = next((bas for tur, bas, _ in self._gruplar(text).isaretler if tur in ("BECMG", "TEMPO", "PROB", "FM")), len(text))
+            return text[:k]
+        return re.split(r'\b(BECMG|TEMPO|PROB\d{2}|FM\d{6})\b', text)[0]
+
     def _compare_values(self, t_vals, m_vals):
         """TAF/Trend değerleri ile METAR değerlerini karşılaştırır ve hataları listeler."""
         t_wind, t_vis, t_cig, t_wx = t_vals
@@ -343,46 +497,151 @@ class HavacilikRobotModulu:
                 
         return errors
 
+    @_onbellekli
     def _parse_all_taf_trends(self, text):
-        """TAF metni içindeki tüm BECMG ve TEMPO gruplarını ayıklar."""
+        """TAF metni içindeki tüm BECMG, TEMPO ve tek başına PROB (Tipi 'PROB30'/'PROB40') gruplarını ayıklar."""
         trends = []
-        # BECMG veya TEMPO kelimelerine göre böl
-        parts = re.split(r'\b(BECMG|TEMPO)\b', text)
-        # parts[0] ana metin, sonraki her ikili (Tip, İçerik) şeklindedir
-        for i in range(1, len(parts), 2):
-            trend_type = parts[i]
-            content = parts[i+1]
-            
-            # Zaman grubunu ayıkla (DDHH/DDHH)
-            time_str = None
-            time_match = re.search(r'\b\d{4}/\d{4}\b', content)
-            if time_match:
-                time_str = time_match.group(0)
+        for trend_type, content, time_str in self._trend_parcalari(text):
+            if time_str:
                 # Zaman grubunu içerikten sil ki Görüş (Visibility) ile karışmasın
                 content = content.replace(time_str, "")
             
-            w = self._parse_wind(content)
-            v = self._parse_visibility(content)
-            c = self._parse_ceiling(content)
-            wx = self._parse_weather(content)
+            w, v, c, wx = self._degerler(content)
             trends.append({'type': trend_type, 'time': time_str, 'wind': w, 'vis': v, 'cig': c, 'wx': wx})
         return trends
 
-    def analiz_et(self, taf_raw, metar_raw, trend_raw, taf_zaman="0412/0512", ref_date=None):
-        """Modülün ana denetleme fonksiyonu. TAF ve METAR'ı karşılaştırır."""
+    def _trend_isaretleri(self, text):
+        """Trend başlatan sözcükler (_RE_TREND_BOLUCU ile aynı): [(Tip, Başlangıç, Bitiş)]."""
+        if not self.hizli:
+            return [(m.group(1), m.start(), m.end()) for m in _RE_TREND_BOLUCU.finditer(text)]
+        isaretler = self._gruplar(text).isaretler
+        secilen = []
+        for i, (tur, bas, bit) in enumerate(isaretler):
+            if tur == "PROB":
+                # PROB TEMPO'da dönem TEMPO'dan başlar; PROB yalnızca niteleyicidir
+                sonraki = isaretler[i+1] if i + 1 < len(isaretler) else None
+                if sonraki and sonraki[0] == "TEMPO" and text[bit:sonraki[1]].isspace(): continue
+                secilen.append((text[bas:bit], bas, bit))
+            elif tur in ("BECMG", "TEMPO"):
+                secilen.append((tur, bas, bit))
+        return secilen
+
+    def _trend_parcalari(self, text):
+        """TAF metnini BECMG/TEMPO/tek başına PROB kelimelerinden böler: [(Tip, İçerik, DDHH/DDHH veya None)]."""
+        if self.hizli:
+            g = self._gruplar(text)
+            isaretler = self._trend_isaretleri(text)
+            parcalar = []
+            for i, (tur, _, bit) in enumerate(isaretler):
+                son = isaretler[i+1][1] if i + 1 < len(isaretler) else len(text)
+                zaman = next((text[a:b] for a, b in g.zamanlar if bit <= a and b <= son), None)
+                parcalar.append((tur, text[bit:son], zaman))
+            return parcalar
+
+        # parts[0] ana metin, sonraki her ikili (Tip, İçerik) şeklindedir
+        parts = _RE_TREND_BOLUCU.split(text)
+        parcalar = []
+        for i in range(1, len(parts), 2):
+            time_match = re.search(r'\b\d{4}/\d{4}\b', parts[i+1])
+            parcalar.append((parts[i], parts[i+1], time_match.group(0) if time_match else None))
+        return parcalar
+
+    def _yayin_zamani(self, text, ref_date):
+        """TAF metnindeki DDHHMMZ yayın grubunu ref_date'e en yakın aya yerleştirir (Yoksa ref_date)."""
+        m = re.search(r'\b(\d{2})(\d{2})(\d{2})Z\b', text)
+        dt = en_yakin(int(m.group(1)), int(m.group(2)), int(m.group(3)), ref_date) if m else None
+        return dt or ref_date
+
+    def taf_derle(self, taf_raw, taf_dt=None, ref_date=None):
+        """
+        TAF'ı bir kez TafCizelgesi'ne derler (Önbellekli): ana kısım, FM, BECMG ve TEMPO dönemleri
+        mutlak zamanlarıyla çözülür. taf_dt verilmezse Bulletin yayın zamanı, o da yoksa metindeki
+        DDHHMMZ grubu (ref_date'e göre) kullanılır.
+        """
+        if taf_dt is None and isinstance(taf_raw, Bulletin): taf_dt = taf_raw.issued
+        text = metni(taf_raw)
+        if taf_dt is None:
+            taf_dt = self._yayin_zamani(text, _py(ref_date) or datetime.utcnow())
+        return self._derle(text, _py(taf_dt))
+
+    def _bolum_derle(self, text, konum, tur, baslangic, taf_dt):
+        """text (TAF veya FM'den itibaren kesiti) için ana dönem ve trendleri derler. konum: kesitin TAF'taki yeri."""
+        body = self._extract_body(text)
+        govde_konum = konum + len(text) - len(body)
+        main_part = self._main_part(body)
+
+        t_wind, t_vis, t_cig, t_wx = self._degerler(main_part)
+        if t_wind is None:
+            return TafBolumu(TafDonemi(tur, konum, baslangic, None, None), [])
+        if t_vis is None: t_vis = 10000
+        if t_cig is None: t_cig = (9999, False)
+        if t_wx is None: t_wx = set()
+        ana = TafDonemi(tur, konum, baslangic, None, (t_wind, t_vis, t_cig, t_wx))
+
+        trendler = []
+        konumlar = [bas for _, bas, _ in self._trend_isaretleri(body)]
+        for tr, k in zip(self._parse_all_taf_trends(body), konumlar):
+            t_start = t_end = None
+            if tr['time']:
+                try: t_start, t_end = self._donem_sinirlari(int(tr['time'][0:2]), int(tr['time'][2:4]),
+                                                            int(tr['time'][5:7]), int(tr['time'][7:9]), taf_dt)
+                except (TypeError, ValueError, OverflowError): pass # Çözülemeyen dönem her zaman geçerli sayılır
+            tip = tr['type']
+            if tip.startswith('PROB'): # Tek başına PROB: olası geçici koşul, TEMPO dönemi olarak
+                tip, olasilik = 'TEMPO', int(tip[4:])
+            else:
+                prob = re.search(r'\bPROB(\d{2})\s+$', body[max(0, k - 8):k])
+                olasilik = int(prob.group(1)) if prob else None
+            # Trend içinde değer yoksa ana kısmın değeri geçerlidir (Persistence)
+            trendler.append(TafDonemi(tip, govde_konum + k, t_start, t_end, (
+                tr['wind'] if tr['wind'] is not None else t_wind,
+                tr['vis'] if tr['vis'] is not None else t_vis,
+                tr['cig'] if tr['cig'] is not None else t_cig,
+                tr['wx'] if tr['wx'] is not None else t_wx), olasilik))
+        return TafBolumu(ana, trendler)
+
+    @_onbellekli
+    def _derle(self, text, taf_dt):
+        bolumler = [self._bolum_derle(text, 0, 'ANA', None, taf_dt)]
+        fm = []
+        for m in re.finditer(r'\bFM(\d{2})(\d{2})(\d{2})\b', text):
+            start_dt = en_yakin(int(m.group(1)), int(m.group(2)), int(m.group(3)), taf_dt) # TAF zamanına en yakın ay
+            if start_dt is None: continue
+            fm.append((start_dt, len(bolumler)))
+            bolumler.append(self._bolum_derle(text[m.start():], m.start(), 'FM', start_dt, taf_dt))
+
+        # Zaman sırasında, o ana kadar başlamış FM'lerden metinde en sondakinin bölümü
+        fm.sort(key=lambda x: x[0])
+        fm_bolum, en_son = [], 0
+        for _, i in fm:
+            en_son = max(en_son, i)
+            fm_bolum.append(en_son)
+
+        donemler = sorted([b.ana for b in bolumler] + bolumler[0].trendler, key=attrgetter("konum"))
+        return TafCizelgesi(text, taf_dt, bolumler, donemler, [x[0] for x in fm], fm_bolum)
+
+    def analiz_et(self, taf_raw, metar_raw, trend_raw, taf_zaman="0412/0512", ref_date=None, taf_dt=None):
+        """
+        Modülün ana denetleme fonksiyonu. TAF ve METAR'ı karşılaştırır.
+        taf_raw/metar_raw düz metin veya Bulletin olabilir; METAR Bulletin ise yayın zamanı ref_date olur.
+        taf_raw tam TAF'tır (veya taf_derle çıktısı); ref_date anında başlamış FM grubu ana kısım sayılır.
+        """
         
+        if ref_date is None and isinstance(metar_raw, Bulletin): ref_date = metar_raw.issued
         if ref_date is None: ref_date = datetime.utcnow()
+        ref_date = _py(ref_date)
+        metar_raw = metni(metar_raw)
 
-        if not taf_raw or not metar_raw:
+        if isinstance(taf_raw, TafCizelgesi): cizelge = taf_raw
+        elif not metni(taf_raw): cizelge = None
+        else: cizelge = self.taf_derle(taf_raw, taf_dt, ref_date)
+
+        if not cizelge or not metar_raw:
             return 0, "VERİ BULUNAMADI", ["TAF veya METAR verisi eksik."]
 
         # Başlıkları temizle (Rüzgar grubundan başlat)
-        taf_body = self._extract_body(taf_raw)
         metar_body = self._extract_body(metar_raw)
         
-        # TAF Ana kısmını izole et (Trendlerden arındır)
-        taf_main_part = re.split(r'\b(BECMG|TEMPO|FM\d{6})\b', taf_body)[0]
-        
         # 1. ZAMAN KONTROLÜ
         metar_time_match = re.search(r'\b\d{6}Z\b', metar_raw)
         # if metar_time_match:
@@ -393,129 +652,53 @@ class HavacilikRobotModulu:
         #         # return 0, "ZAMAN UYUMSUZLUĞU", [msg]
 
         # --- PARSE METAR ---
-        m_wind = self._parse_wind(metar_body)
-        if m_wind is None: 
+        metar_vals = self._metar_degerleri(metar_body)
+        if metar_vals is None: 
             return 0, "VERİ BULUNAMADI", ["METAR rüzgar verisi okunamadı."]
-        
-        m_vis = self._parse_visibility(metar_body)
-        if m_vis is None: m_vis = 10000
-        
-        m_cig = self._parse_ceiling(metar_body)
-        if m_cig is None: m_cig = (9999, False)
-        
-        m_wx = self._parse_weather(metar_body)
-        if m_wx is None: m_wx = set() # METAR'da hadise yoksa boş set
-        
-        metar_vals = (m_wind, m_vis, m_cig, m_wx)
 
-        # --- PARSE TAF ---
-        t_wind = self._parse_wind(taf_main_part)
-        if t_wind is None: 
+        # --- TAF (Derlenmiş çizelgeden ref_date anındaki bölüm) ---
+        bolum = cizelge.bolum(ref_date)
+        taf_vals = bolum.ana.degerler
+        if taf_vals is None:
             return 0, "VERİ BULUNAMADI", ["TAF rüzgar verisi okunamadı."]
-        
-        t_vis = self._parse_visibility(taf_main_part)
-        if t_vis is None: t_vis = 10000
-        
-        t_cig = self._parse_ceiling(taf_main_part)
-        if t_cig is None: t_cig = (9999, False)
-        
-        t_wx = self._parse_weather(taf_main_part)
-        if t_wx is None: t_wx = set() # TAF'ta hadise yoksa boş set
-        
-        taf_vals = (t_wind, t_vis, t_cig, t_wx)
+
+        m_dt = None
+        if metar_time_match:
+            m_code = metar_time_match.group(0)
+            m_dt = self._resolve_dt(int(m_code[0:2]), int(m_code[2:4]), int(m_code[4:6]), ref_date)
         
         # --- COMPARE TAF vs METAR ---
         errors = self._compare_values(taf_vals, metar_vals)
-        taf_trends = self._parse_all_taf_trends(taf_body)
         
         if not errors:
             # METAR, TAF'ın ana periyodu (Eski Durum) ile uyumlu.
             # Ancak BECMG bitişine yaklaşıldıysa ve değişim henüz olmadıysa (METAR hala eski),
             # METAR Trend'inde BECMG verilmesi beklenir.
-            if metar_time_match:
-                try:
-                    m_d = int(metar_time_match.group(0)[0:2])
-                    m_h = int(metar_time_match.group(0)[2:4])
-                    m_m = int(metar_time_match.group(0)[4:6])
-                    m_dt = self._resolve_dt(m_d, m_h, m_m, ref_date)
-                    
-                    if m_dt:
-                        for tr in taf_trends:
-                            if tr['type'] == 'BECMG' and tr['time']:
-                                tm = re.match(r'(\d{2})(\d{2})/(\d{2})(\d{2})', tr['time'])
-                                if tm:
-                                    te_d, te_h = int(tm.group(3)), int(tm.group(4))
-                                    t_end = self._resolve_dt(te_d, te_h, 0, m_dt)
-                                    
-                                    if t_end:
-                                        diff = (t_end - m_dt).total_seconds() / 60
-                                        # Son 60 dakika içindeyiz
-                                        if 0 < diff <= 60:
-                                            if not (trend_raw and "BECMG" in trend_raw):
-                                                eff_wind = tr['wind'] if tr['wind'] is not None else t_wind
-                                                eff_vis = tr['vis'] if tr['vis'] is not None else t_vis
-                                                eff_cig = tr['cig'] if tr['cig'] is not None else t_cig
-                                                eff_wx = tr['wx'] if tr['wx'] is not None else t_wx
-                                                if self._compare_values((eff_wind, eff_vis, eff_cig, eff_wx), metar_vals):
-                                                    return 50, "DİKKAT", [f"BECMG bitişine {int(diff)}dk kaldı. Değişim gerçekleşmedi ve Trend verilmedi."]
-                except: pass
+            if m_dt and not (trend_raw and "BECMG" in trend_raw):
+                for tr in bolum.trendler:
+                    if tr.tur == 'BECMG' and tr.bitis:
+                        diff = (tr.bitis - m_dt).total_seconds() / 60
+                        # Son 60 dakika içindeyiz
+                        if 0 < diff <= 60 and self._compare_values(tr.degerler, metar_vals):
+                            return 50, "DİKKAT", [f"BECMG bitişine {int(diff)}dk kaldı. Değişim gerçekleşmedi ve Trend verilmedi."]
             return 100, "UYUMLU", []
         
         # --- TAF İÇİNDEKİ TRENDLERİ (BECMG/TEMPO) KONTROL ET ---
-        for tr in taf_trends:
-            # Zaman kontrolü
-            if tr['time'] and metar_time_match:
-                if not self._is_trend_active(tr['time'], metar_time_match.group(0), tr['type'], ref_date):
-                    continue
-
-            # Trend içinde değer varsa onu kullan, yoksa ana TAF değerini koru (Persistence)
-            eff_wind = tr['wind'] if tr['wind'] is not None else t_wind
-            eff_vis = tr['vis'] if tr['vis'] is not None else t_vis
-            eff_cig = tr['cig'] if tr['cig'] is not None else t_cig
-            eff_wx = tr['wx'] if tr['wx'] is not None else t_wx
-            
-            # Bu kombinasyonla tekrar karşılaştır
-            tr_errors = self._compare_values((eff_wind, eff_vis, eff_cig, eff_wx), metar_vals)
-            if not tr_errors:
+        # METAR saatinde geçerli trendlerin değerleriyle (Eksikler ana TAF'tan) tekrar karşılaştır
+        for tr in bolum.trendler_at(m_dt):
+            if not self._compare_values(tr.degerler, metar_vals):
                 return 100, "UYUMLU (TAF Trend)", []
 
         # 2. YAKIN ZAMANLI TREND KONTROLÜ (BUFFER - DİKKAT)
-        # Eğer ana kısım ve strict trendler uymadıysa, 60dk buffer ile kontrol et.
-        if errors:
-            for tr in taf_trends:
-                if tr['time'] and metar_time_match:
-                    # Strict kontrolde (buffer=0) zaten bakıldı, eğer orada uymadıysa veya zaman tutmadıysa buraya gelir.
-                    # Sadece zamanı tutmayanlar (erken gelenler) için buffer ile bakıyoruz.
-                    if self._is_trend_active(tr['time'], metar_time_match.group(0), tr['type'], ref_date, buffer_minutes=90):
-                        eff_wind = tr['wind'] if tr['wind'] is not None else t_wind
-                        eff_vis = tr['vis'] if tr['vis'] is not None else t_vis
-                        eff_cig = tr['cig'] if tr['cig'] is not None else t_cig
-                        eff_wx = tr['wx'] if tr['wx'] is not None else t_wx
-                        if not self._compare_values((eff_wind, eff_vis, eff_cig, eff_wx), metar_vals):
-                            return 50, "DİKKAT", errors + ["TAF Trendi ile erken uyum (Buffer)"]
-
-        # Hala hata varsa, METAR Trendine bak (Aşağıdaki mevcut kod)
-        if not errors:
-            return 100, "UYUMLU", []
-        
+        # Ana kısım ve strict trendler uymadıysa, 90dk buffer ile kontrol et (Erken gelen değişimler).
+        if m_dt:
+            for tr in bolum.trendler_at(m_dt, tampon_dk=90):
+                if tr.baslangic is not None and not self._compare_values(tr.degerler, metar_vals):
+                    return 50, "DİKKAT", errors + ["TAF Trendi ile erken uyum (Buffer)"]
 
         # --- ANALYZE METAR TREND ---
         if trend_raw:
-            # Parse METAR Trend
-            # Use METAR main values as fallback (Persistence)
-            w = self._parse_wind(trend_raw)
-            mt_wind = w if w is not None else m_wind
-            
-            v = self._parse_visibility(trend_raw)
-            mt_vis = v if v is not None else m_vis
-            
-            c = self._parse_ceiling(trend_raw)
-            mt_cig = c if c is not None else m_cig
-            
-            wx = self._parse_weather(trend_raw)
-            mt_wx = wx if wx is not None else m_wx
-            
-            metar_trend_vals = (mt_wind, mt_vis, mt_cig, mt_wx)
+            metar_trend_vals = self._trend_degerleri(trend_raw, metar_vals)
             
             # Compare TAF (Expected) vs METAR Trend (Forecasted Observation)
             trend_errors = self._compare_values(taf_vals, metar_trend_vals)
@@ -527,6 +710,27 @@ class HavacilikRobotModulu:
             
         return 0, "UYUMSUZ", errors
 
+    def analiz_et_batch(self, taf_raw, metars, ref_date=None, taf_dt=None):
+        """
+        Tek TAF'ın yönettiği METAR/SPECI dizisini değerlendirir; TAF bir kez derlenir.
+        metars Bulletin (yayın zamanı ref_date olur) veya düz metin (ref_date kullanılır) dizisidir,
+        METAR trendi metnin kendisinden ayrılır. Her METAR için (skor, durum, nedenler, kodlar) döner.
+        """
+        metars = list(metars)
+        if not metars: return []
+        ilk = metars[0].issued if isinstance(metars[0], Bulletin) else None
+        cizelge = self.taf_derle(taf_raw, taf_dt, ilk or ref_date) if metni(taf_raw) else None
+
+        sonuclar = []
+        for m in metars:
+            metar_txt = metni(m)
+            tr_m = re.search(r'\b(BECMG|TEMPO|NOSIG)\b', metar_txt) if metar_txt else None
+            trend_part = metar_txt[tr_m.start():] if tr_m else ""
+            m_ref = m.issued if isinstance(m, Bulletin) and m.issued is not None else ref_date
+            skor, durum, nedenler = self.analiz_et(cizelge, metar_txt, trend_part, ref_date=m_ref)
+            sonuclar.append((skor, durum, nedenler, neden_kodlari(nedenler)))
+        return sonuclar
+
 # --- MODÜL KULLANIMI ---
 if __name__ == "__main__":
     robot = HavacilikRobotModulu()
@@ -559,4 +763,45 @@ if __name__ == "__main__":
         "BECMG 20010KT",
         ref_date=datetime(2024,10,4,13,30)
     )
-    print(f"Robot Skoru: %{skor} | Durum: {durum}")
\ No newline at end of file
+    print(f"Robot Skoru: %{skor} | Durum: {durum}")
+
+    print("\n--- GRUP ÇÖZÜCÜ FARK TESTİ (hizli=True vs _parse_* regex yardımcıları) ---")
+    import random
+    import time
+    eski = HavacilikRobotModulu(hizli=False)
+    rnd = random.Random(0)
+    gruplar = [
+        ["20010KT", "VRB03KT", "24018G28KT", "36005MPS", "00000KT", "210105KT"],
+        ["9999", "0800", "3000", "CAVOK", "1500 R36/1200", "0400 R05L/P1500N R23/0350V0600U"],
+        ["", "-RA", "+TSRA", "-TSRA", "SHRA", "VCTS", "FZFG", "BCFG", "-SN", "BLSN", "GR", "SQ", "FC", "+SS", "VCDS", "RERA", "NSW", "BR"],
+        ["NSC", "SKC", "FEW020", "SCT030 BKN100", "BKN015CB OVC020", "VV002", "OVC003", "SCT010 BKN020TCU"],
+    ]
+    def rapor():
+        return " ".join(x for x in (rnd.choice(g) for g in gruplar) if x)
+
+    metarlar, taflar = [], []
+    for _ in range(2000):
+        metarlar.append(f"METAR LTFM 041330Z {rapor()} 08/03 Q1015 " + rnd.choice(["NOSIG", f"BECMG {rapor()}", f"TEMPO TL1400 {rapor()}"]) + "=")
+        taflar.append(f"TAF LTFM 041100Z 0412/0512 {rapor()} PROB30 TEMPO 0414/0418 {rapor()} BECMG 0420/0422 {rapor()} "
+                      f"FM050200 {rapor()} TEMPO 0503/0506 {rapor()} PROB40 0508/0510 {rapor()}=")
+
+    farkli = 0
+    for t in metarlar + taflar:
+        body = eski._extract_body(t)
+        for x in (t, body, eski._main_part(body)):
+            if (eski._degerler(x) != robot._degerler(x) or eski._main_part(x) != robot._main_part(x)
+                    or eski._parse_all_taf_trends(x) != robot._parse_all_taf_trends(x)):
+                farkli += 1
+    for taf, metar in zip(taflar, metarlar):
+        tr_m = re.search(r'\b(NOSIG|BECMG|TEMPO)\b', metar)
+        trend = metar[tr_m.start():] if tr_m else ""
+        if eski.analiz_et(taf, metar, trend, ref_date=datetime(2024,10,4,13,30)) != robot.analiz_et(taf, metar, trend, ref_date=datetime(2024,10,4,13,30)):
+            farkli += 1
+    durum = "✅ GEÇTİ" if farkli == 0 else f"❌ KALDI ({farkli} fark)"
+    print(f"{durum} | {len(metarlar)} METAR, {len(taflar)} TAF")
+
+    for r in (eski, robot):
+        r.onbellek_temizle()
+        t0 = time.perf_counter()
+        for t in metarlar: r._metar_degerleri(r._extract_body(t))
+        print(f"hizli={r.hizli}: METAR başına {(time.perf_counter() - t0) / len(metarlar) * 1e6:.0f} µs")
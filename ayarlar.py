@@ -1,8 +1,29 @@
 # -*- coding: utf-8 -*-
+import os
 
 STATION = "LTAN"
 WMO_ID = "17244"
 
+# Yerel bülten arşivi (SQLite). Daha önce çekilmiş aralıklar tekrar indirilmez.
+ARSIV_DOSYASI = "bulten_arsivi.db"
+# Son X dakika "kesinleşmemiş" kabul edilir (Geç gelen bültenler için her seferinde yeniden çekilir)
+ARSIV_GUNCEL_PAY_DK = 30
+# Bu kadar saatten uzun bir pencerede hiç bülten gelmezse (Kota/tanınmayan sayfa) kapsam işaretlenmez
+ARSIV_BOS_PENCERE_SAAT = 3
+
+# Harita taramasında TAF aramak için geriye bakılan süre (saat, tek istekte çekilir)
+HARITA_TAF_GERIYE_SAAT = 30
+
+# Ham Ogimet yanıt arşivi (gzip, içerik adresli). None: arşivleme kapalı (Varsayılan).
+# Boyut sınırı/temizlik yoktur; yalnızca kayıt/replay gereken oturumlarda açılmalıdır.
+# Örn: HAM_ARSIV_DIZINI=ham_yanitlar python ogimet_icao_analiz.py
+HAM_ARSIV_DIZINI = os.environ.get("HAM_ARSIV_DIZINI") or None
+# True: Sorgular ağa çıkmadan ham arşivden yanıtlanır (Tekrarlanabilir / çevrimdışı çalışma)
+HAM_ARSIV_REPLAY = False
+
+# Ogimet adresi. Yerel test sunucusu için: OGIMET_BASE_URL=http://127.0.0.1:8765
+OGIMET_BASE_URL = os.environ.get("OGIMET_BASE_URL", "https://www.ogimet.com")
+
 # Türkiye Geneli İstasyon Listesi (Koordinatlı)
 TURKEY_STATIONS = {
     "LTFJ": {"lat": 40.89, "lon": 29.30}, "LTFM": {"lat": 41.27, "lon": 28.75},
@@ -28,6 +28,30 @@ def proje_yapisi():
             "desc": "⚙️ VERİ İŞLEME\n    -> Ham metin verilerini tabloya dönüştüren yardımcı modül.",
             "status": "required"
         },
+        "zaman_cozucu.py": {
+            "desc": "🕒 ZAMAN ÇÖZÜCÜ\n    -> DDHHMM zaman kodlarını referansa en yakın aya yerleştirir (Tekil önbellekli / NumPy dizi).",
+            "status": "required"
+        },
+        "vektorel_dogrulama.py": {
+            "desc": "🧮 VEKTÖREL DOĞRULAMA\n    -> METAR/TAF değerlerini sütunsal tabloya çözer, eşik/hadise kurallarını NumPy ile toplu değerlendirir.",
+            "status": "required"
+        },
+        "grup_cozucu.py": {
+            "desc": "🔤 GRUP ÇÖZÜCÜ\n    -> METAR/TAF sözcüklerini tek geçişte biçimine göre sınıflandırır (Rüzgar, görüş, RVR, hadise, bulut, VV, trend işaretleri).",
+            "status": "required"
+        },
+        "bulten.py": {
+            "desc": "📄 BÜLTEN KAYDI\n    -> Ayrıştırıcı, analiz motoru ve arayüzler arasında taşınan Bulletin tipi.",
+            "status": "required"
+        },
+        "bulten_arsivi.py": {
+            "desc": "🗄️ BÜLTEN ARŞİVİ\n    -> Çekilen bültenleri yerel SQLite'ta saklar, sadece eksik aralıkları indirir.",
+            "status": "required"
+        },
+        "ham_arsiv.py": {
+            "desc": "📦 HAM YANIT ARŞİVİ\n    -> Ogimet yanıtlarını sıkıştırıp saklar, replay modunda çevrimdışı yanıtlar.",
+            "status": "required"
+        },
         "ayarlar.py": {
             "desc": "🛠️ AYARLAR\n    -> İstasyon listesi ve harita koordinatlarını içeren dosya.",
             "status": "required"
@@ -36,6 +60,22 @@ def proje_yapisi():
             "desc": "📦 EXE OLUŞTURUCU\n    -> Projeyi tek tıklamayla .exe dosyasına çeviren araç.",
             "status": "utility"
         },
+        "yerel_aktarim.py": {
+            "desc": "📥 YEREL DÖKÜM AKTARIMI\n    -> Kayıtlı Ogimet HTML/TXT dökümlerini paralel ayrıştırıp bülten arşivine yükler.",
+            "status": "utility"
+        },
+        "iwxxm_okuyucu.py": {
+            "desc": "🧾 IWXXM OKUYUCU\n    -> IWXXM XML METAR/TAF dosyalarını akış halinde okuyup process_data kayıtlarına çevirir.",
+            "status": "utility"
+        },
+        "performans_testi.py": {
+            "desc": "⏱️ PERFORMANS TESTİ\n    -> Ayrıştırma adımlarının hızını ölçer (python performans_testi.py pre).",
+            "status": "utility"
+        },
+        "ogimet_sahte_sunucu.py": {
+            "desc": "🧪 OGIMET TEST SUNUCUSU\n    -> Gecikme/hata oranı ayarlanabilir yerel Ogimet taklidi (OGIMET_BASE_URL ile kullanılır).",
+            "status": "utility"
+        },
         "bilgi.py": {
             "desc": "ℹ️ BİLGİ EKRANI\n    -> Bu dosya. Sistem kontrollerini yapar.",
             "status": "utility"
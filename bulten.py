@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+bulten.py
+Ayrıştırıcı (veri_isleme), analiz motoru (TAF_METAR_TREND) ve arayüzler arasında
+taşınan bülten kaydı. Hiçbir dış kütüphaneye bağımlı değildir.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime
+
+@dataclass(slots=True)
+class Bulletin:
+    station: str            # ICAO kodu (SİNOPTİK için WMO no)
+    kind: str               # METAR, SPECI, TAF, SİNOPTİK
+    issued: datetime        # Yayın zamanı (Çözülemediyse None)
+    text: str               # Ham bülten metni (Zaman damgası ve tür kelimesi hariç)
+    id: int                 # Kararlı kimlik (veri_isleme.bulten_kimligi)
+
+    def __str__(self):
+        return self.text
+
+    @property
+    def date(self):
+        """Görüntüleme tarihi (GG.AA.YYYY SS:DD)."""
+        return "---" if self.issued is None else "%02d.%02d.%d %02d:%02d" % (
+            self.issued.day, self.issued.month, self.issued.year, self.issued.hour, self.issued.minute)
+
+    def to_record(self):
+        """process_data/iter_records sütun adlarıyla sözlük (DataFrame satırı) döner."""
+        return {"date": self.date, "Türü": self.kind, "İstasyon": self.station, "Bülten": self.text,
+                "_dt": self.issued if self.issued is not None else datetime.min, "_id": self.id}
+
+    @classmethod
+    def from_record(cls, rec):
+        """DataFrame satırı veya iter_records sözlüğünden Bulletin oluşturur."""
+        issued = rec["_dt"]
+        if hasattr(issued, "to_pydatetime"): issued = issued.to_pydatetime()
+        return cls(rec["İstasyon"], rec["Türü"], None if issued == datetime.min else issued, rec["Bülten"], int(rec["_id"]))
+
+def metni(b):
+    """Bulletin veya düz metin alır, bülten metnini döner."""
+    return b.text if isinstance(b, Bulletin) else b
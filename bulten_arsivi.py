@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""
+bulten_arsivi.py
+Ogimet'ten çekilen bültenleri yerel bir SQLite veritabanında saklar.
+
+Her bülten (istasyon, tür, yayın zamanı, metin özeti) anahtarıyla tutulur; aynı dakikada
+yayınlanan farklı bültenler (TAF ve TAF AMD, METAR ve COR, iki SPECI) birbirini ezmez.
+Ayrıca hangi zaman aralıklarının daha önce çekildiği (kapsam) kaydedilir. fetch() çağrıldığında
+önce eksik alt aralıklar hesaplanır, RASATLAR.fetch yalnızca bu aralıklar için
+çağrılır ve sonuç tamamen arşivden döndürülür.
+"""
+
+import re
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime, timedelta, timezone
+import RASATLAR
+from ayarlar import ARSIV_DOSYASI, ARSIV_GUNCEL_PAY_DK, ARSIV_BOS_PENCERE_SAAT
+
+ZAMAN_FMT = "%Y-%m-%d %H:%M"
+
+# Ogimet satır başı zaman damgaları
+# HTML (METAR/TAF): "202401011200 METAR LTAN 011200Z ..."
+# TXT  (SYNOP)    : "17244,2024,01,01,12,00,AAXX 01121 17244 ..."
+_RE_ZAMAN = re.compile(r'^(\d{12})\b')
+_RE_SYNOP_ZAMAN = re.compile(r'^(\d{5}),(\d{4}),(\d{2}),(\d{2}),(\d{2}),(\d{2})')
+
+_yazma_kilidi = threading.Lock()
+
+def metin_ozeti(metin):
+    """Bülten metninin kısa, kararlı özeti (Aynı dakikadaki bültenleri ayırmak için)."""
+    return hashlib.sha1(metin.encode("utf-8")).hexdigest()[:16]
+
+_BULTEN_TABLOSU = """CREATE TABLE IF NOT EXISTS bultenler (
+        istasyon TEXT NOT NULL,
+        tur TEXT NOT NULL,
+        zaman TEXT NOT NULL,
+        ozet TEXT NOT NULL,
+        metin TEXT NOT NULL,
+        PRIMARY KEY (istasyon, tur, zaman, ozet))"""
+
+def _tabloyu_yukselt(conn):
+    """Eski (istasyon, tür, zaman) anahtarlı tabloyu metin özetli anahtara taşır."""
+    sutunlar = [r[1] for r in conn.execute("PRAGMA table_info(bultenler)")]
+    if not sutunlar or "ozet" in sutunlar: return
+    conn.create_function("metin_ozeti", 1, metin_ozeti)
+    with conn:
+        conn.execute("ALTER TABLE bultenler RENAME TO bultenler_eski")
+        conn.execute(_BULTEN_TABLOSU)
+        conn.execute("""INSERT OR IGNORE INTO bultenler SELECT istasyon, tur, zaman, metin_ozeti(metin), metin
+                        FROM bultenler_eski ORDER BY rowid""")
+        conn.execute("DROP TABLE bultenler_eski")
+
+def _baglan(db_path=None):
+    conn = sqlite3.connect(db_path or ARSIV_DOSYASI, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    _tabloyu_yukselt(conn)
+    conn.execute(_BULTEN_TABLOSU)
+    conn.execute("""CREATE TABLE IF NOT EXISTS kapsam (
+        istasyon TEXT NOT NULL,
+        kaynak TEXT NOT NULL,
+        baslangic TEXT NOT NULL,
+        bitis TEXT NOT NULL)""")
+    conn.execute("CREATE INDEX IF NOT EXISTS ix_kapsam ON kapsam (istasyon, kaynak)")
+    return conn
+
+def _satir_zamani(line):
+    """Satır yeni bir bülten başlatıyorsa (zaman, tür) döner, aksi halde None."""
+    m = _RE_ZAMAN.match(line)
+    if m:
+        try:
+            dt = datetime.strptime(m.group(1), "%Y%m%d%H%M")
+        except ValueError:
+            return None
+        parts = line.split(None, 2)
+        tur = parts[1] if len(parts) > 1 and parts[1] in ("METAR", "TAF", "SPECI") else "DİĞER"
+        return dt, tur
+    m = _RE_SYNOP_ZAMAN.match(line)
+    if m:
+        try:
+            dt = datetime(*(int(g) for g in m.groups()[1:]))
+        except ValueError:
+            return None
+        return dt, "SİNOPTİK"
+    return None
+
+def bultenlere_ayir(lines):
+    """
+    Ham Ogimet satırlarını bültenlere gruplar.
+    [(zaman, tür, [satırlar]), ...] döner. İlk zaman damgasından önceki satırlar atlanır.
+    """
+    bultenler = []
+    current = None
+    for line in lines:
+        bas = _satir_zamani(line)
+        if bas:
+            current = (bas[0], bas[1], [line])
+            bultenler.append(current)
+        elif current:
+            current[2].append(line)
+    return bultenler
+
+def eksik_araliklar(kapsamlar, start_dt, end_dt):
+    """
+    Gap planner: [start_dt, end_dt] aralığından, kapsamlar listesindeki
+    (başlangıç, bitiş) aralıklarının örtmediği alt aralıkları döner.
+    Ogimet dakika çözünürlüklü çalıştığı için 1 dakikalık boşluklar birleştirilir.
+    """
+    eksik = []
+    cursor = start_dt
+    for k_start, k_end in sorted(kapsamlar):
+        if k_end < cursor: continue
+        if k_start > end_dt: break
+        if k_start - cursor > timedelta(minutes=1):
+            eksik.append((cursor, k_start - timedelta(minutes=1)))
+        cursor = max(cursor, k_end + timedelta(minutes=1))
+        if cursor > end_dt: break
+    if cursor <= end_dt:
+        eksik.append((cursor, end_dt))
+    return eksik
+
+def _kapsamlari_oku(conn, istasyon, kaynak):
+    rows = conn.execute("SELECT baslangic, bitis FROM kapsam WHERE istasyon=? AND kaynak=?", (istasyon, kaynak)).fetchall()
+    return [(datetime.strptime(a, ZAMAN_FMT), datetime.strptime(b, ZAMAN_FMT)) for a, b in rows]
+
+def _kapsam_ekle(conn, istasyon, kaynak, start_dt, end_dt):
+    """Yeni aralığı mevcut kapsamlarla birleştirip tabloyu yeniden yazar."""
+    araliklar = sorted(_kapsamlari_oku(conn, istasyon, kaynak) + [(start_dt, end_dt)])
+    birlesik = []
+    for a, b in araliklar:
+        if birlesik and a <= birlesik[-1][1] + timedelta(minutes=1):
+            birlesik[-1] = (birlesik[-1][0], max(birlesik[-1][1], b))
+        else:
+            birlesik.append((a, b))
+    conn.execute("DELETE FROM kapsam WHERE istasyon=? AND kaynak=?", (istasyon, kaynak))
+    conn.executemany("INSERT INTO kapsam VALUES (?, ?, ?, ?)",
+                     [(istasyon, kaynak, a.strftime(ZAMAN_FMT), b.strftime(ZAMAN_FMT)) for a, b in birlesik])
+
+def kaydet(istasyon, lines, wmo_id=None, kapsam=None, db_path=None, kaynaklar=("METAR", "SYNOP")):
+    """
+    Ham satırları bültenlere ayırıp arşive yazar (Aynı bülten ikinci kez yazılmaz).
+    kapsam=(başlangıç, bitiş) verilirse bu aralık, kaynaklar içindeki kaynaklar için "çekildi" olarak işaretlenir.
+    """
+    bultenler = bultenlere_ayir(lines)
+    rows = []
+    for dt, tur, satirlar in bultenler:
+        ist = wmo_id if (tur == "SİNOPTİK" and wmo_id) else istasyon
+        metin = "\n".join(satirlar)
+        rows.append((ist, tur, dt.strftime(ZAMAN_FMT), metin_ozeti(metin), metin))
+
+    with _yazma_kilidi:
+        conn = _baglan(db_path)
+        try:
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO bultenler VALUES (?, ?, ?, ?, ?)", rows)
+                if kapsam:
+                    if "METAR" in kaynaklar:
+                        _kapsam_ekle(conn, istasyon, "METAR", kapsam[0], kapsam[1])
+                    if wmo_id and "SYNOP" in kaynaklar:
+                        _kapsam_ekle(conn, wmo_id, "SYNOP", kapsam[0], kapsam[1])
+        finally:
+            conn.close()
+    return len(rows)
+
+def satirlari_getir(start_dt, end_dt, station, wmo_id=None, db_path=None):
+    """
+    Arşivdeki bültenleri RASATLAR.fetch ile aynı sırada (METAR/TAF yeniden eskiye,
+    ardından SYNOP) ham satır listesi olarak döner.
+    """
+    conn = _baglan(db_path)
+    try:
+        a, b = start_dt.strftime(ZAMAN_FMT), end_dt.strftime(ZAMAN_FMT)
+        metinler = [r[0] for r in conn.execute(
+            "SELECT metin FROM bultenler WHERE istasyon=? AND tur!='SİNOPTİK' AND zaman BETWEEN ? AND ? ORDER BY zaman DESC, rowid",
+            (station, a, b))]
+        if wmo_id:
+            metinler += [r[0] for r in conn.execute(
+                "SELECT metin FROM bultenler WHERE istasyon=? AND tur='SİNOPTİK' AND zaman BETWEEN ? AND ? ORDER BY zaman DESC, rowid",
+                (wmo_id, a, b))]
+    finally:
+        conn.close()
+
+    lines = []
+    for metin in metinler:
+        lines.extend(metin.split("\n"))
+    return lines
+
+def planla(start_dt, end_dt, station, wmo_id=None, db_path=None):
+    """İstenen aralık için arşivde eksik olan (çekilmesi gereken) alt aralıkları döner."""
+    conn = _baglan(db_path)
+    try:
+        eksik = eksik_araliklar(_kapsamlari_oku(conn, station, "METAR"), start_dt, end_dt)
+        if wmo_id:
+            eksik += eksik_araliklar(_kapsamlari_oku(conn, wmo_id, "SYNOP"), start_dt, end_dt)
+    finally:
+        conn.close()
+
+    # METAR ve SYNOP eksiklerini birleştir (Aynı istekle ikisi birden çekilir)
+    birlesik = []
+    for a, b in sorted(eksik):
+        if birlesik and a <= birlesik[-1][1] + timedelta(minutes=1):
+            birlesik[-1] = (birlesik[-1][0], max(birlesik[-1][1], b))
+        else:
+            birlesik.append((a, b))
+    return birlesik
+
+def guvenilir_kaynaklar(lines, start_dt, end_dt, wmo_id=None):
+    """
+    Yanıtın kapsam olarak işaretlenebileceği kaynakları döner.
+    ARSIV_BOS_PENCERE_SAAT'ten uzun bir pencerede hiç bülten gelmeyen kaynak (Kota sayfası,
+    <pre> içermeyen/tanınmayan sayfa) işaretlenmez; bir sonraki çağrıda yeniden çekilir.
+    """
+    if end_dt - start_dt < timedelta(hours=ARSIV_BOS_PENCERE_SAAT):
+        return ("METAR", "SYNOP")
+    turler = {tur for _, tur, _ in bultenlere_ayir(lines)}
+    kaynaklar = []
+    if turler - {"SİNOPTİK"}: kaynaklar.append("METAR")
+    if wmo_id and "SİNOPTİK" in turler: kaynaklar.append("SYNOP")
+    return tuple(kaynaklar)
+
+def fetch(start_dt, end_dt, station="LTAN", wmo_id=None, timeout=30, include_synop=True, db_path=None):
+    """
+    RASATLAR.fetch ile aynı imza ve dönüş formatı; ancak yalnızca arşivde
+    bulunmayan alt aralıkları Ogimet'ten indirir.
+    """
+    if not station: return RASATLAR.fetch(start_dt, end_dt, station=station, wmo_id=wmo_id, timeout=timeout, include_synop=include_synop)
+    if not include_synop: wmo_id = None
+
+    # Son birkaç dakika kesinleşmemiş sayılır, kapsam olarak işaretlenmez
+    simdi = datetime.now(timezone.utc).replace(tzinfo=None)
+    kesin_sinir = simdi - timedelta(minutes=ARSIV_GUNCEL_PAY_DK)
+
+    for g_start, g_end in planla(start_dt, end_dt, station, wmo_id, db_path):
+        kapsam_bas = g_start
+        try:
+            lines = RASATLAR.fetch(g_start, g_end, station=station, wmo_id=wmo_id, timeout=timeout, raise_errors=True)
+        except RASATLAR.EksikYanit as e:
+            # Kesik yanıt: Gelen kısım kaydedilir, kapsam yalnızca eksik dakikadan sonrası için işaretlenir
+            lines, kapsam_bas = e.lines, e.eksik_bitis + timedelta(minutes=1)
+            print(f"Arşiv: {station} {g_start:%d.%m.%Y %H:%M} - {e.eksik_bitis:%d.%m.%Y %H:%M} eksik, kapsam işaretlenmedi")
+        except Exception as e:
+            print(f"Arşiv: {station} {g_start:%d.%m.%Y %H:%M} - {g_end:%d.%m.%Y %H:%M} çekilemedi ({e})")
+            continue
+        kapsam_bitis = min(g_end, kesin_sinir)
+        kapsam = (kapsam_bas, kapsam_bitis) if kapsam_bitis >= kapsam_bas else None
+        kaynaklar = guvenilir_kaynaklar(lines, kapsam_bas, g_end, wmo_id)
+        if kapsam and len(kaynaklar) < (2 if wmo_id else 1):
+            print(f"Arşiv: {station} {kapsam_bas:%d.%m.%Y %H:%M} - {g_end:%d.%m.%Y %H:%M} boş/tanınmayan yanıt, kapsam işaretlenmedi")
+        kaydet(station, lines, wmo_id=wmo_id, kapsam=kapsam, db_path=db_path, kaynaklar=kaynaklar)
+
+    return satirlari_getir(start_dt, end_dt, station, wmo_id, db_path)
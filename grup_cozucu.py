@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+"""
+grup_cozucu.py
+METAR/TAF metnini tek geçişte sözcüklerine ayırıp her sözcüğü biçimine göre sınıflandıran
+çözücü. Rüzgar, görüş, RVR, hadise, bulut katmanları, tavan/VV, CAVOK ve trend işaretleri
+(BECMG/TEMPO/FM/PROB/NOSIG) aynı taramada doldurulur. Analiz motorunun _parse_* yardımcıları
+metni her alan için ayrı regex'le (Hadiselerde 10 desen) tararken burada metin başına
+tek regex taraması (\\w+) yapılır, sınıflandırma karakter dizisi işlemleriyle yapılır.
+
+Sözcükler, yardımcıların \\b sınırlarıyla aynı ayrılır: harf/rakam dizisidir ("R36/1500" iki
+sözcük, "20010KT=" tek sözcük). Alan anlamları da yardımcılarla aynıdır (İlk 4 haneli sözcük
+görüş, CAVOK/SKC/NSC/CLR geçen metinde tavan 9999 vb.). Hadiseler yalnızca hadise biçimli
+sözcüklerden (Kod tablosundaki iki harfli parçalar, RE'li geçmiş hadiseler hariç) okunur ve
+kritik_hadiseler desenleriyle sözcük başına bir kez etiketlenir (Önbellekli).
+"""
+
+import re
+from dataclasses import dataclass, field
+
+_RE_SOZCUK = re.compile(r"\w+")
+
+# Hadise sözcüğünü oluşturabilecek iki harfli parçalar (Yakınlık, tanımlayıcı, hadise)
+HADISE_PARCALARI = frozenset((
+    "VC", "MI", "PR", "BC", "DR", "BL", "SH", "TS", "FZ",
+    "DZ", "RA", "SN", "SG", "IC", "PL", "GR", "GS", "UP",
+    "BR", "FG", "FU", "VA", "DU", "SA", "HZ", "PY",
+    "PO", "SQ", "FC", "SS", "DS",
+))
+KATMAN_TIPLERI = ("FEW", "SCT", "BKN", "OVC")
+ACIK_KODLAR = ("CAVOK", "SKC", "NSC", "CLR") # Tavanı 9999 kabul ettiren kodlar
+TREND_KELIMELERI = ("BECMG", "TEMPO", "NOSIG")
+
+@dataclass(slots=True)
+class RaporGruplari:
+    ruzgar: tuple = None            # (Yön, Hız, Hamle); VRB için yön 0
+    ruzgar_konum: int = None        # Rüzgar grubunun metindeki başlangıcı
+    gorus: int = None               # Metre (CAVOK: 10000)
+    tavan: tuple = None             # (Yükseklik ft, VV mi)
+    vv: int = None                  # Dikey görüş (ft)
+    cavok: bool = False
+    hadise: set = None              # Kritik hadise etiketleri (NSW: boş küme, hiç yoksa None)
+    katmanlar: list = field(default_factory=list)   # [(Tip, ft)] FEW/SCT/BKN/OVC/VV
+    rvr: list = field(default_factory=list)         # [(Pist, Değer)] Örn: ("R36L", "P1500N")
+    isaretler: list = field(default_factory=list)   # [(Tür, Başlangıç, Bitiş)] BECMG/TEMPO/NOSIG/FM/PROB
+    zamanlar: list = field(default_factory=list)    # [(Başlangıç, Bitiş)] DDHH/DDHH grupları
+
+    @property
+    def degerler(self):
+        """Motorun karşılaştırdığı (Rüzgar, Görüş, Tavan, Hadise) dörtlüsü (Eksikler None)."""
+        return self.ruzgar, self.gorus, self.tavan, self.hadise
+
+def ruzgar_coz(s):
+    """(\\d{3}|VRB)(\\d{2,3})(G\\d{2,3})?KT biçimindeki sözcüğü (Yön, Hız, Hamle) olarak çözer."""
+    if len(s) < 7 or s[-2:] != "KT": return None
+    yon = s[:3]
+    if yon != "VRB" and not yon.isdecimal(): return None
+    hiz, g, hamle = s[3:-2].partition("G")
+    if not (2 <= len(hiz) <= 3 and hiz.isdecimal()): return None
+    if g and not (2 <= len(hamle) <= 3 and hamle.isdecimal()): return None
+    return 0 if yon == "VRB" else int(yon), int(hiz), int(hamle) if g else 0
+
+def _kod_degerleri(s, onek):
+    """s içinde onek + 3 rakam gruplarının (Örn: BKN015CB içindeki 015) değerlerini sırayla verir."""
+    i = s.find(onek)
+    while i >= 0:
+        j = i + len(onek)
+        d = s[j:j+3]
+        if len(d) == 3 and d.isdecimal():
+            yield int(d)
+            i = s.find(onek, j + 3)
+        else:
+            i = s.find(onek, i + 1)
+
+def pist_mi(s):
+    """RVR pist sözcüğü mü (R + 2 rakam + isteğe bağlı L/C/R, Örn: R36, R05L)."""
+    return 3 <= len(s) <= 4 and s[0] == "R" and s[1:3].isdecimal() and (len(s) == 3 or s[3] in "LCR")
+
+def hadise_bicimli(s):
+    """Sözcük yalnızca hadise parçalarından oluşuyorsa True (Örn: TSRA, VCSH, FZFG)."""
+    return len(s) % 2 == 0 and all(s[i:i+2] in HADISE_PARCALARI for i in range(0, len(s), 2))
+
+class GrupCozucu:
+    """kritik_hadiseler sözlüğüne bağlı çözücü. Sözlük değişirse yenisi oluşturulmalıdır."""
+
+    def __init__(self, kritik_hadiseler):
+        self._desenler = [(ad, re.compile(desen)) for ad, desen in kritik_hadiseler.items()]
+        self._etiketler = {}
+
+    def hadise_etiketleri(self, sozcuk, onceki=" ", sonraki=" "):
+        """Hadise sözcüğünün (Önceki/sonraki karakteriyle, Örn: '-RA') eşleştiği etiketler."""
+        key = (onceki, sozcuk, sonraki)
+        e = self._etiketler.get(key)
+        if e is None:
+            metin = onceki + sozcuk + sonraki
+            e = self._etiketler[key] = tuple(ad for ad, d in self._desenler if d.search(metin))
+        return e
+
+    def coz(self, text):
+        """Metni tek geçişte RaporGruplari'na çözer."""
+        g = RaporGruplari(cavok="CAVOK" in text)
+        nsw = "NSW" in text
+        hadise, bulut = set(), []
+        onceki_bas = onceki_bit = -1
+        onceki, pist = "", False
+
+        for m in _RE_SOZCUK.finditer(text):
+            s = m.group()
+            bas, bit = m.span()
+            n, c = len(s), s[0]
+
+            if pist and text[onceki_bit:bas] == "/": # RVR (Örn: R36/1500, R36L/P1500N)
+                g.rvr.append((onceki, s))
+            if c.isdecimal():
+                if n == 4 and s.isdecimal():
+                    if g.gorus is None: g.gorus = int(s)
+                    if len(onceki) == 4 and onceki.isdecimal() and text[onceki_bit:bas] == "/":
+                        g.zamanlar.append((onceki_bas, bit))
+                elif g.ruzgar is None and s[-2:] == "KT":
+                    g.ruzgar = ruzgar_coz(s)
+                    if g.ruzgar is not None: g.ruzgar_konum = bas
+            elif s in TREND_KELIMELERI:
+                g.isaretler.append((s, bas, bit))
+            elif n == 8 and s[:2] == "FM" and s[2:].isdecimal():
+                g.isaretler.append(("FM", bas, bit))
+            elif n == 6 and s[:4] == "PROB" and s[4:].isdecimal():
+                g.isaretler.append(("PROB", bas, bit))
+            elif n == 6 and s[:3] in KATMAN_TIPLERI and s[3:].isdecimal():
+                g.katmanlar.append((s[:3], int(s[3:]) * 100))
+            elif n == 5 and s[:2] == "VV" and s[2:].isdecimal():
+                g.katmanlar.append(("VV", int(s[2:]) * 100))
+            elif g.ruzgar is None and s[:3] == "VRB":
+                g.ruzgar = ruzgar_coz(s)
+                if g.ruzgar is not None: g.ruzgar_konum = bas
+            elif not nsw and hadise_bicimli(s):
+                hadise.update(self.hadise_etiketleri(s, text[bas-1] if bas else " ", text[bit] if bit < len(text) else " "))
+
+            # Tavan, bulut kodlarını sözcük içinde de arar (Örn: BKN015CB)
+            if "VV" in s and g.vv is None:
+                g.vv = next((v * 100 for v in _kod_degerleri(s, "VV")), None)
+            if "BKN" in s or "OVC" in s:
+                bulut.extend(_kod_degerleri(s, "BKN"))
+                bulut.extend(_kod_degerleri(s, "OVC"))
+
+            onceki, onceki_bas, onceki_bit = s, bas, bit
+            pist = c == "R" and pist_mi(s)
+
+        if g.cavok:
+            g.gorus = 10000
+        if g.cavok or any(k in text for k in ACIK_KODLAR[1:]):
+            g.tavan = (9999, False)
+        elif g.vv is not None:
+            g.tavan = (g.vv, True)
+        elif bulut:
+            g.tavan = (min(bulut) * 100, False)
+        g.hadise = set() if nsw else (hadise or None)
+        return g
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+ham_arsiv.py
+Ogimet'ten gelen ham yanıtları sıkıştırılmış, içerik adresli bir arşive yazar
+ve istenirse ağa hiç çıkmadan aynı sorguları arşivden yanıtlar (replay modu).
+
+Dizin yapısı:
+    <dizin>/nesneler/ab/abcdef....gz   -> Yanıt gövdesi (gzip, adı gövdenin SHA-256 özeti)
+    <dizin>/sorgular/0123....json      -> Sorgu (URL + parametreler) ve ilgili gövde özeti
+
+Aynı içerik farklı sorgulardan gelse de diskte tek kopya tutulur.
+Arşivleme varsayılan olarak kapalıdır; HAM_ARSIV_DIZINI ortam değişkeni/ayarı veya
+ayarla(dizin=...) ile açılır. Boyut sınırı ve temizlik yoktur.
+"""
+
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+from urllib.parse import urlsplit
+from datetime import datetime, timezone
+from ayarlar import HAM_ARSIV_DIZINI, HAM_ARSIV_REPLAY
+
+_dizin = HAM_ARSIV_DIZINI
+_replay = HAM_ARSIV_REPLAY
+
+class ArsivdeYok(LookupError):
+    """Replay modunda istenen sorgu arşivde bulunamadı."""
+
+class ArsivYaniti:
+    """Arşivden okunan yanıt. RASATLAR'ın kullandığı requests.Response alanlarını taşır."""
+    def __init__(self, url, status_code, content, encoding):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.apparent_encoding = encoding
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+def ayarla(dizin=None, replay=None):
+    """
+    Arşiv dizinini ve replay modunu çalışma anında değiştirir.
+    dizin="" verilirse arşivleme kapatılır.
+    """
+    global _dizin, _replay
+    if dizin is not None: _dizin = dizin or None
+    if replay is not None: _replay = bool(replay)
+
+def aktif_mi():
+    return bool(_dizin)
+
+def replay_mi():
+    return bool(_dizin) and _replay
+
+def sorgu_anahtari(url, params):
+    """
+    URL yolu ve parametrelerden sıra bağımsız, kararlı sorgu anahtarı üretir.
+    Sunucu adı anahtara katılmaz; böylece kayıtlar yerel test sunucusundan da yanıtlanabilir.
+    """
+    kanonik = json.dumps({"url": urlsplit(url).path, "params": {k: str(v) for k, v in (params or {}).items()}}, sort_keys=True)
+    return hashlib.sha256(kanonik.encode("utf-8")).hexdigest()
+
+def _atomik_yaz(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+def _nesne_yolu(ozet):
+    return os.path.join(_dizin, "nesneler", ozet[:2], ozet + ".gz")
+
+def _sorgu_yolu(anahtar):
+    return os.path.join(_dizin, "sorgular", anahtar + ".json")
+
+def kaydet(url, params, response):
+    """Yanıt gövdesini ve sorgu bilgisini arşive yazar. Gövdenin özetini döner."""
+    if not _dizin: return None
+    content = response.content
+    ozet = hashlib.sha256(content).hexdigest()
+
+    nesne = _nesne_yolu(ozet)
+    if not os.path.exists(nesne):
+        _atomik_yaz(nesne, gzip.compress(content, compresslevel=6))
+
+    kayit = {
+        "url": url,
+        "params": {k: str(v) for k, v in (params or {}).items()},
+        "status": response.status_code,
+        "encoding": response.encoding or response.apparent_encoding,
+        "icerik": ozet,
+        "boyut": len(content),
+        "zaman": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+    }
+    _atomik_yaz(_sorgu_yolu(sorgu_anahtari(url, params)), json.dumps(kayit, ensure_ascii=False, indent=1).encode("utf-8"))
+    return ozet
+
+def yukle(url, params):
+    """Sorgunun arşivdeki yanıtını döner; yoksa ArsivdeYok yükseltir."""
+    path = _sorgu_yolu(sorgu_anahtari(url, params)) if _dizin else None
+    if not path or not os.path.exists(path):
+        raise ArsivdeYok(f"Arşivde yok: {url} {params}")
+    with open(path, "r", encoding="utf-8") as f:
+        kayit = json.load(f)
+    with open(_nesne_yolu(kayit["icerik"]), "rb") as f:
+        content = gzip.decompress(f.read())
+    return ArsivYaniti(url, kayit["status"], content, kayit.get("encoding"))
+
+def sorgular():
+    """Arşivdeki tüm sorgu kayıtlarını (dict) üretir."""
+    if not _dizin: return
+    klasor = os.path.join(_dizin, "sorgular")
+    if not os.path.isdir(klasor): return
+    for ad in sorted(os.listdir(klasor)):
+        if ad.endswith(".json"):
+            with open(os.path.join(klasor, ad), "r", encoding="utf-8") as f:
+                yield json.load(f)
@@ -0,0 +1,361 @@
+# -*- coding: utf-8 -*-
+"""
+IWXXM OKUYUCU
+IWXXM (XML) METAR/SPECI/TAF raporlarını sabit bellekle (iterparse) okur, her raporu
+Ogimet satırı biçiminde en küçük TAC metnine çevirir ve veri_isleme ayrıştırıcısından
+geçirir. Böylece çıkan kayıtlar process_data ile aynıdır; analiz motoru ve arayüzler
+değişiklik olmadan kullanır.
+
+Tek rapor dosyaları, COLLECT bültenleri ve günlük büyük paketler (.xml veya .xml.gz)
+desteklenir. Her rapor işlendikten sonra ağaçtan silinir.
+
+Kullanım:
+    python iwxxm_okuyucu.py paket.xml                 (Özet)
+    python iwxxm_okuyucu.py paket.xml.gz --arsiv      (bulten_arsivi'ne yükle)
+"""
+
+import gzip
+import argparse
+import xml.etree.ElementTree as ET
+from datetime import datetime, timedelta
+
+import veri_isleme
+
+RAPOR_TURLERI = ("METAR", "SPECI", "TAF")
+_XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+DEGISIM_GOSTERGELERI = {
+    "BECOMING": "BECMG",
+    "TEMPORARY_FLUCTUATIONS": "TEMPO",
+    "PROBABILITY_30": "PROB30",
+    "PROBABILITY_40": "PROB40",
+    "PROBABILITY_30_TEMPORARY_FLUCTUATIONS": "PROB30 TEMPO",
+    "PROBABILITY_40_TEMPORARY_FLUCTUATIONS": "PROB40 TEMPO",
+}
+
+# Sayısal WMO kod tablosu bağlantıları (bufr4/codeflag/0-20-008/3, 0-20-012/9) -> TAC kısaltması.
+# 49-2/CloudAmountReportedAtAerodrome/BKN gibi bağlantılar zaten kısaltmayla biter.
+BULUT_MIKTARLARI = {"1": "FEW", "2": "SCT", "3": "BKN", "4": "OVC"}   # 0-20-008
+BULUT_TURLERI = {"9": "CB", "32": "TCU"}                              # 0-20-012
+
+# =============================================================================
+# XML YARDIMCILARI (Namespace bağımsız: IWXXM 2.x / 3.x)
+# =============================================================================
+def _ad(elem):
+    """Namespace'siz etiket adı."""
+    tag = elem.tag
+    return tag[tag.rfind("}") + 1:] if tag[0] == "{" else tag
+
+def _bul(elem, ad):
+    """Alt ağaçtaki ilk 'ad' etiketli eleman (Kendisi hariç)."""
+    for e in elem.iter():
+        if e is not elem and _ad(e) == ad:
+            return e
+    return None
+
+def _ilk(*elemanlar):
+    """None olmayan ilk eleman (Element'in doğruluk değeri alt eleman sayısına bağlıdır, 'or' kullanılmaz)."""
+    for e in elemanlar:
+        if e is not None: return e
+    return None
+
+def _hepsi(elem, ad):
+    return [e for e in elem.iter() if e is not elem and _ad(e) == ad]
+
+def _cocuk(elem, ad):
+    """Yalnızca doğrudan alt elemanlar arasında arar."""
+    for e in elem:
+        if _ad(e) == ad:
+            return e
+    return None
+
+def _sayi(elem, ad):
+    e = _bul(elem, ad) if elem is not None else None
+    if e is None or e.text is None or not e.text.strip(): return None, None
+    try:
+        return float(e.text), e.get("uom", "")
+    except ValueError:
+        return None, None
+
+def _kod(elem):
+    """xlink:href kod listesi bağlantısının son parçası (Örn: .../CloudAmount.../BKN -> BKN)."""
+    href = elem.get(_XLINK_HREF) or ""
+    return href.rstrip("/").rsplit("/", 1)[-1] if href else ""
+
+def _kod_tablodan(elem, tablo):
+    """_kod; son parça sayısal WMO kodu ise tablodaki kısaltması (Bilinmeyen sayısal kod: boş)."""
+    kod = _kod(elem)
+    return tablo.get(kod, "") if kod.isdigit() else kod
+
+def _yuz_ft(deger, uom):
+    """Yükseklik (uom 'm' ise metre, değilse ft) -> TAC'taki yüz ft sayısı."""
+    if uom == "m":
+        return int(round(deger / 0.3048 / 100))
+    return int(deger) // 100
+
+def _zaman(metin):
+    """ISO 8601 (2024-01-01T12:00:00Z) -> datetime (UTC, tz'siz)."""
+    metin = metin.strip().replace("Z", "")
+    return datetime.strptime(metin[:16], "%Y-%m-%dT%H:%M")
+
+def _zaman_bul(elem, ad):
+    """issueTime/observationTime gibi bir elemanın altındaki ilk timePosition."""
+    e = _bul(elem, ad)
+    if e is None: return None
+    tp = _bul(e, "timePosition")
+    return _zaman(tp.text) if tp is not None and tp.text else None
+
+def _donem(elem):
+    """TimePeriod (begin/end) veya TimeInstant -> (başlangıç, bitiş)."""
+    bas = _bul(elem, "beginPosition")
+    bit = _bul(elem, "endPosition")
+    if bas is not None and bit is not None and bas.text and bit.text:
+        return _zaman(bas.text), _zaman(bit.text)
+    tp = _bul(elem, "timePosition")
+    if tp is not None and tp.text:
+        return _zaman(tp.text), None
+    return None, None
+
+# =============================================================================
+# TAC GRUPLARI
+# =============================================================================
+def _ddhh(dt, bitis=False):
+    """Geçerlilik saati. Bitiş 00 UTC ise önceki günün 24'ü yazılır (TAC kuralı)."""
+    if bitis and dt.hour == 0 and dt.minute == 0:
+        dt -= timedelta(days=1)
+        return f"{dt.day:02d}24"
+    return f"{dt.day:02d}{dt.hour:02d}"
+
+def _ruzgar(grup):
+    ruzgar = _ilk(_bul(grup, "AerodromeSurfaceWind"), _bul(grup, "AerodromeSurfaceWindForecast"))
+    if ruzgar is None: return []
+    hiz, uom = _sayi(ruzgar, "meanWindSpeed")
+    if hiz is None: return []
+    yon, _ = _sayi(ruzgar, "meanWindDirection")
+    ani, _ = _sayi(ruzgar, "windGustSpeed")
+    birim = "MPS" if uom == "m/s" else "KT"
+    yon_txt = "VRB" if ruzgar.get("variableWindDirection") == "true" or yon is None else f"{int(round(yon)):03d}"
+    ani_txt = f"G{int(round(ani)):02d}" if ani is not None else ""
+    return [f"{yon_txt}{int(round(hiz)):02d}{ani_txt}{birim}"]
+
+def _gorus(grup):
+    deger, _ = _sayi(grup, "prevailingVisibility")
+    if deger is None: return []
+    return ["9999" if deger >= 10000 else f"{int(deger):04d}"]
+
+def _hadiseler(grup):
+    return [k for k in (_kod(e) for e in _hepsi(grup, "presentWeather") + _hepsi(grup, "weather")) if k]
+
+def _bulutlar(grup):
+    tokenler = []
+    vv, uom = _sayi(grup, "verticalVisibility")
+    if vv is not None:
+        tokenler.append(f"VV{_yuz_ft(vv, uom):03d}")
+    for katman in _hepsi(grup, "CloudLayer"):
+        miktar = _bul(katman, "amount")
+        taban, uom = _sayi(katman, "base")
+        if miktar is None or taban is None: continue
+        miktar = _kod_tablodan(miktar, BULUT_MIKTARLARI)
+        if not miktar: continue
+        tur = _bul(katman, "cloudType")
+        tokenler.append(f"{miktar}{_yuz_ft(taban, uom):03d}{_kod_tablodan(tur, BULUT_TURLERI) if tur is not None else ''}")
+    if not tokenler:
+        bulut = _bul(grup, "cloud")
+        if bulut is not None and "noSignificantCloud" in (bulut.get("nilReason") or ""):
+            tokenler.append("NSC")
+    return tokenler
+
+def _hava_gruplari(grup):
+    """Rüzgar, görüş/CAVOK, hadise ve bulut grupları."""
+    tokenler = _ruzgar(grup)
+    if grup.get("cloudAndVisibilityOK") == "true":
+        return tokenler + ["CAVOK"]
+    return tokenler + _gorus(grup) + _hadiseler(grup) + _bulutlar(grup)
+
+def _sicaklik(deger):
+    d = int(round(deger))
+    return f"M{abs(d):02d}" if d < 0 else f"{d:02d}"
+
+def _gozlem_gruplari(gozlem):
+    tokenler = _hava_gruplari(gozlem)
+    t, _ = _sayi(gozlem, "airTemperature")
+    td, _ = _sayi(gozlem, "dewpointTemperature")
+    if t is not None and td is not None:
+        tokenler.append(f"{_sicaklik(t)}/{_sicaklik(td)}")
+    q, _ = _sayi(gozlem, "qnh")
+    if q is not None:
+        tokenler.append(f"Q{int(round(q)):04d}")
+    return tokenler
+
+# =============================================================================
+# RAPOR -> OGIMET SATIRI
+# =============================================================================
+def _istasyon(rapor):
+    for ad in ("locationIndicatorICAO", "designator"):
+        e = _bul(_ilk(_bul(rapor, "aerodrome"), rapor), ad)
+        if e is not None and e.text and e.text.strip():
+            return e.text.strip()
+    return None
+
+def _durum_kelimesi(rapor, tur):
+    durum = (rapor.get("reportStatus") or rapor.get("status") or "").upper()
+    if durum == "CORRECTION": return ["COR"]
+    if durum == "AMENDMENT" and tur == "TAF": return ["AMD"]
+    return []
+
+def _metar_tac(rapor, istasyon, zaman):
+    tokenler = [istasyon, f"{zaman:%d%H%M}Z"]
+    gozlem = _bul(rapor, "MeteorologicalAerodromeObservation")
+    if gozlem is None or rapor.get("isNil") == "true":
+        return tokenler + ["NIL"]
+    tokenler += _gozlem_gruplari(gozlem)
+
+    trendler = _hepsi(rapor, "trendForecast")
+    if any("noSignificantChange" in (t.get("nilReason") or "") for t in trendler):
+        tokenler.append("NOSIG")
+    for t in trendler:
+        tahmin = _bul(t, "MeteorologicalAerodromeTrendForecast")
+        if tahmin is None: continue
+        gosterge = DEGISIM_GOSTERGELERI.get(tahmin.get("changeIndicator", ""), "")
+        if not gosterge: continue
+        tokenler.append(gosterge)
+        tokenler += _hava_gruplari(tahmin)
+    return tokenler
+
+def _taf_tac(rapor, istasyon, zaman):
+    tokenler = [istasyon, f"{zaman:%d%H%M}Z"]
+    gecerlilik = _bul(rapor, "validPeriod")
+    bas, bit = _donem(gecerlilik) if gecerlilik is not None else (None, None)
+    if bas and bit:
+        tokenler.append(f"{_ddhh(bas)}/{_ddhh(bit, bitis=True)}")
+    if rapor.get("isCancelReport") == "true" or rapor.get("cancelledReportValidPeriod"):
+        return tokenler + ["CNL"]
+
+    ana = _cocuk(rapor, "baseForecast")
+    if ana is None:
+        return tokenler + ["NIL"]
+    tahmin = _bul(ana, "MeteorologicalAerodromeForecast")
+    if tahmin is not None:
+        tokenler += _hava_gruplari(tahmin)
+        # Sıcaklık grupları (TX/TN)
+        for ad, onek in (("maximumAirTemperature", "TX"), ("minimumAirTemperature", "TN")):
+            t, _ = _sayi(tahmin, ad)
+            zt = _bul(tahmin, ad + "Time")
+            zt_dt = _donem(zt)[0] if zt is not None else None
+            if t is not None and zt_dt is not None:
+                tokenler.append(f"{onek}{_sicaklik(t)}/{zt_dt:%d%H}Z")
+
+    for degisim in (e for e in rapor if _ad(e) == "changeForecast"):
+        tahmin = _bul(degisim, "MeteorologicalAerodromeForecast")
+        if tahmin is None: continue
+        gosterge = tahmin.get("changeIndicator", "")
+        dbas, dbit = _donem(_ilk(_bul(tahmin, "phenomenonTime"), tahmin))
+        if gosterge == "FROM":
+            if dbas is None: continue
+            tokenler.append(f"FM{dbas:%d%H%M}")
+        else:
+            gosterge = DEGISIM_GOSTERGELERI.get(gosterge)
+            if not gosterge or dbas is None or dbit is None: continue
+            tokenler += [gosterge, f"{_ddhh(dbas)}/{_ddhh(dbit, bitis=True)}"]
+        tokenler += _hava_gruplari(tahmin)
+    return tokenler
+
+def rapor_satiri(rapor):
+    """
+    Tek IWXXM rapor elemanını (METAR/SPECI/TAF) Ogimet satırına çevirir.
+    (istasyon, "YYYYMMDDHHMM TÜR TAC=") döner; çevrilemezse None.
+    """
+    tur = _ad(rapor)
+    istasyon = _istasyon(rapor)
+    if not istasyon: return None
+    if tur == "TAF":
+        zaman = _zaman_bul(rapor, "issueTime")
+    else:
+        zaman = _zaman_bul(rapor, "observationTime") or _zaman_bul(rapor, "issueTime")
+    if zaman is None: return None
+
+    tac = _taf_tac(rapor, istasyon, zaman) if tur == "TAF" else _metar_tac(rapor, istasyon, zaman)
+    return istasyon, f"{zaman:%Y%m%d%H%M} {' '.join([tur] + _durum_kelimesi(rapor, tur) + tac)}="
+
+# =============================================================================
+# AKIŞ
+# =============================================================================
+def _ac(kaynak):
+    if isinstance(kaynak, str) and kaynak.endswith(".gz"):
+        return gzip.open(kaynak, "rb")
+    return open(kaynak, "rb") if isinstance(kaynak, str) else kaynak
+
+def iter_satirlar(kaynak):
+    """
+    XML dosyasını (yol veya ikili dosya nesnesi) akış halinde okur, her rapor için
+    (istasyon, Ogimet satırı) üretir. Bellek kullanımı dosya boyutundan bağımsızdır.
+    """
+    f = _ac(kaynak)
+    try:
+        kok = None
+        derinlik = 0  # İç içe rapor elemanı (Örn: TAF içindeki previousReport) yoksayılır
+        for olay, elem in ET.iterparse(f, events=("start", "end")):
+            if kok is None: kok = elem
+            if _ad(elem) not in RAPOR_TURLERI: continue
+            if olay == "start":
+                derinlik += 1
+                continue
+            derinlik -= 1
+            if derinlik: continue
+            sonuc = rapor_satiri(elem)
+            if sonuc: yield sonuc
+            elem.clear()
+            kok.clear() # İşlenen raporları ağaçtan at (Sabit bellek)
+    finally:
+        if f is not kaynak: f.close()
+
+def iter_records(kaynak, ref_dt=None):
+    """Raporları process_data kayıtlarıyla aynı sözlükler olarak üretir (veri_isleme.iter_records)."""
+    for istasyon, satir in iter_satirlar(kaynak):
+        yield from veri_isleme.iter_records([satir], istasyon, "", ref_dt)
+
+def process_file(kaynak, ref_dt=None):
+    """Dosyadaki raporları istasyon bazında process_data tablolarına çevirir: {istasyon: DataFrame}."""
+    gruplar = {}
+    for istasyon, satir in iter_satirlar(kaynak):
+        gruplar.setdefault(istasyon, []).append(satir)
+    return {ist: veri_isleme.process_data(lines, ist, "", ref_dt) for ist, lines in gruplar.items()}
+
+def arsive_yukle(kaynak, db_path=None, parti=5000):
+    """Raporları parti parti bulten_arsivi'ne yazar. {istasyon: bülten sayısı} döner."""
+    import bulten_arsivi
+    sayilar, gruplar, bekleyen = {}, {}, 0
+
+    def bosalt():
+        for ist, lines in gruplar.items():
+            sayilar[ist] = sayilar.get(ist, 0) + bulten_arsivi.kaydet(ist, lines, db_path=db_path)
+        gruplar.clear()
+
+    for istasyon, satir in iter_satirlar(kaynak):
+        gruplar.setdefault(istasyon, []).append(satir)
+        bekleyen += 1
+        if bekleyen >= parti:
+            bosalt()
+            bekleyen = 0
+    bosalt()
+    return sayilar
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="IWXXM METAR/SPECI/TAF dosyalarını okur")
+    ap.add_argument("dosyalar", nargs="+")
+    ap.add_argument("--arsiv", action="store_true", help="bulten_arsivi veritabanına yükle")
+    ap.add_argument("--db", default=None)
+    ap.add_argument("--goster", type=int, default=0, help="İlk N satırı yazdır")
+    a = ap.parse_args()
+
+    for yol in a.dosyalar:
+        if a.arsiv:
+            sayilar = arsive_yukle(yol, db_path=a.db)
+            print(f"{yol}: {sum(sayilar.values())} bülten, {len(sayilar)} istasyon arşive yazıldı")
+            continue
+        adet, istasyonlar = 0, set()
+        for istasyon, satir in iter_satirlar(yol):
+            if adet < a.goster: print(satir)
+            adet += 1
+            istasyonlar.add(istasyon)
+        print(f"{yol}: {adet} rapor, {len(istasyonlar)} istasyon")
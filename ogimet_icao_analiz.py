@@ -7,17 +7,18 @@ import threading
 import pandas as pd
 import re
 import math
+from bisect import bisect_right
 import requests
 from bs4 import BeautifulSoup
 from tkcalendar import DateEntry
 import urllib3
-import time
 import json
 import os
 import RASATLAR
+import bulten_arsivi
 import TAF_METAR_TREND
-from ayarlar import STATION, WMO_ID, TURKEY_STATIONS, TURKEY_BORDER
-from veri_isleme import process_data
+from ayarlar import STATION, WMO_ID, TURKEY_STATIONS, TURKEY_BORDER, HARITA_TAF_GERIYE_SAAT, ARSIV_GUNCEL_PAY_DK
+from veri_isleme import process_data, filter_new_records, BulletinParser, taf_ile_analiz
 
 # SSL Hatalarını Gizle
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -41,6 +42,11 @@ class App(tk.Tk):
         self.auto_refresh_var = tk.BooleanVar()
         self.bg_scan_var = tk.BooleanVar()
         self.incompatible_df = pd.DataFrame() # Uyumsuzluk takip verisi
+        self.full_ids, self.full_ids_df = set(), None # full_df'teki bülten kimlikleri (_id)
+        self.incompatible_ids = set()
+        self.bg_state = {} # Arka plan taraması: istasyon -> {"parser": BulletinParser, "kayitlar": {_id: Bulletin}}
+        self.bg_son_basari = {} # İstasyon -> Eksiksiz çekilip işlendiği son tarama zamanı
+        self.bg_scan_lock = threading.Lock()
         self.monitor_window = None
         self.monitor_tree = None
         self.refresh_job = None
@@ -214,76 +220,80 @@ class App(tk.Tk):
             self.after(600000, self.bg_scan_loop) # 10 dakika
 
     def perform_background_scan(self):
+        if not self.bg_scan_lock.acquire(blocking=False): return # Önceki tur sürüyor
+        try:
+            self._perform_background_scan()
+        finally:
+            self.bg_scan_lock.release()
+
+    def _perform_background_scan(self):
         now = datetime.now(timezone.utc).replace(tzinfo=None)
         s_dt = now - timedelta(hours=48) # 48 Saatlik Tarama
         e_dt = now
+        kesin_sinir = now - timedelta(minutes=ARSIV_GUNCEL_PAY_DK)
+        # Artımlı tarama: her istasyon, eksiksiz çekildiği son turdan sonraki (ve henüz kesinleşmemiş
+        # son dakikalardaki) satırlarla beslenir. Çekilemeyen istasyon sonraki turda 48 saatten tekrar denenir.
+        pencereler = {}
+        for code in TURKEY_STATIONS:
+            son = self.bg_son_basari.get(code)
+            f_dt = s_dt if son is None else max(s_dt, son - timedelta(minutes=ARSIV_GUNCEL_PAY_DK))
+            pencereler.setdefault(f_dt, []).append(code)
         incompatible_list = [] # Popup için (Sadece son 1 saat)
         incompatible_rows = []
         
-        for code in TURKEY_STATIONS.keys():
+        def sonuclar():
+            # İstasyonlar ortak Session ile paralel çekilir, sonuçlar geldikçe işlenir.
+            # Yerel arşiv sayesinde her turda yalnızca son dakikalar indirilir.
+            for f_dt, codes in pencereler.items():
+                for code, lines in RASATLAR.fetch_many(codes, f_dt, e_dt, timeout=10, fetch_func=bulten_arsivi.fetch, include_synop=False):
+                    yield code, f_dt, lines
+
+        for code, f_dt, lines in sonuclar():
             if not self.bg_scan_var.get(): return
             try:
-                lines = RASATLAR.fetch(s_dt, e_dt, station=code, timeout=10)
-                if lines:
-                    df = process_data(lines, code, "", ref_dt=e_dt)
-                    tafs = df[df['Türü'] == 'TAF'].sort_values(by='_dt')
-                    metars = df[df['Türü'].isin(['METAR', 'SPECI'])].sort_values(by='_dt')
+                state = self.bg_state.get(code)
+                if state is None:
+                    state = self.bg_state[code] = {"parser": BulletinParser(code, "", ref_dt=e_dt), "kayitlar": {}}
+                kayitlar = state["kayitlar"]
+
+                # Yeni veya güncellenen bültenleri 48 saatlik pencereye işle
+                new_metars = []
+                for b in state["parser"].feed(lines):
+                    if b.issued is None or b.issued < s_dt or b.id in kayitlar: continue
+                    kayitlar[b.id] = b
+                    if b.kind in ("METAR", "SPECI"): new_metars.append(b)
+                for eski in state["parser"].degisenler: kayitlar.pop(eski, None) # Devamı gelen açık bültenin eski sürümü
+                for key in [k for k, b in kayitlar.items() if b.issued < s_dt]: del kayitlar[key]
+
+                if new_metars:
+                    tafs = sorted((b for b in kayitlar.values() if b.kind == 'TAF'), key=lambda b: b.issued)
+                    taf_times = [b.issued for b in tafs]
                     
-                    if not metars.empty and not tafs.empty:
-                        # Son 48 saatteki TÜM METAR'ları kontrol et
-                        for _, last_metar in metars.iterrows():
-                            metar_txt = last_metar['Bülten']
-                            metar_dt = last_metar['_dt']
+                    if tafs:
+                        # Bu turda yeni gelen METAR'ları kontrol et (İlk turda son 48 saatin tamamı)
+                        for last_metar in sorted(new_metars, key=lambda b: b.issued):
+                            metar_txt = last_metar.text
+                            metar_dt = last_metar.issued
                             
-                            rel_tafs = tafs[tafs['_dt'] <= metar_dt]
-                            if rel_tafs.empty: continue
+                            i = bisect_right(taf_times, metar_dt) # metar_dt'den önceki son TAF
+                            if i == 0: continue
                             
-                            target_taf = rel_tafs.iloc[-1]
+                            target_taf = tafs[i - 1]
                             # 3 saat kuralı (Eski TAF ile eşleşmeyi önle)
-                            if (metar_dt - target_taf['_dt']) > timedelta(hours=3): continue
+                            if (metar_dt - target_taf.issued) > timedelta(hours=3): continue
 
-                            taf_txt = target_taf['Bülten']
-                            taf_dt = target_taf['_dt']
+                            taf_txt = target_taf.text
                             
                             # TAF Zamanı
                             regex_period = r'(?:0[1-9]|[12]\d|3[01])(?:[01]\d|2[0-4])/(?:0[1-9]|[12]\d|3[01])(?:[01]\d|2[0-4])'
                             t_valid = re.search(r'\b' + regex_period + r'\b', taf_txt)
                             taf_zaman = t_valid.group(0) if t_valid else "0000/0000"
                             
-                            # FM Grubu Analizi
-                            active_taf = taf_txt
-                            try:
-                                best_change_start = -1
-                                change_pattern = r'\bFM(?P<fm>\d{6})\b'
-                                for m in re.finditer(change_pattern, taf_txt):
-                                    start_dt = None
-                                    try:
-                                        if m.group('fm'):
-                                            time_code = m.group('fm')
-                                            day, hour, minute = int(time_code[0:2]), int(time_code[2:4]), int(time_code[4:6])
-                                            start_dt = taf_dt.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
-                                        
-                                        if start_dt:
-                                            if start_dt.day < taf_dt.day and (taf_dt.day - start_dt.day) > 15:
-                                                if start_dt.month == 12: start_dt = start_dt.replace(year=start_dt.year+1, month=1)
-                                                else: start_dt = start_dt.replace(month=start_dt.month+1)
-                                            elif start_dt.day > taf_dt.day and (start_dt.day - taf_dt.day) > 15:
-                                                if start_dt.month == 1: start_dt = start_dt.replace(year=start_dt.year-1, month=12)
-                                                else: start_dt = start_dt.replace(month=start_dt.month-1)
-                                            
-                                            if start_dt <= metar_dt:
-                                                best_change_start = max(best_change_start, m.start())
-                                    except: continue
-
-                                if best_change_start != -1:
-                                    active_taf = taf_txt[best_change_start:]
-                            except: pass
-                            
                             trend_part = ""
                             tr_m = re.search(r'\b(BECMG|TEMPO|NOSIG)\b', metar_txt)
                             if tr_m: trend_part = metar_txt[tr_m.start():]
                             
-                            skor, status_code, reasons = robot.analiz_et(active_taf, metar_txt, trend_part, taf_zaman)
+                            skor, status_code, reasons = robot.analiz_et(target_taf, last_metar, trend_part, taf_zaman)
                             
                             # UYUMSUZ veya DİKKAT durumlarını yakala
                             if "UYUMSUZ" in status_code or "DİKKAT" in status_code:
@@ -310,12 +320,17 @@ class App(tk.Tk):
                                         detay_str += "\n\n2- TREND KONTROLÜ:\n• ✅ METAR Trendi TAF limitlerine giriyor."
                                         detay_str += "\n\n3- SONUÇ:\n• ⚠️ DİKKAT (METAR Trendi ile uyumlu)"
                                 
-                                row_data = last_metar.to_dict()
+                                row_data = last_metar.to_record()
                                 row_data["_uyum"] = icon
                                 row_data["_detay"] = detay_str
                                 row_data["_ref_taf"] = taf_txt
                                 incompatible_rows.append(row_data)
-            except: pass
+
+                # Arşivde bu pencerede eksik aralık kalmadıysa istasyon bu tur eksiksiz çekilmiştir
+                if not bulten_arsivi.planla(f_dt, kesin_sinir, code):
+                    self.bg_son_basari[code] = now
+            except Exception as e:
+                print(f"Arka plan tarama hatası ({code}): {e}")
             
         if incompatible_list and self.bg_scan_var.get():
             report = "⚠️ ARKA PLAN TARAMA UYARISI ⚠️\n\nAşağıdaki istasyonlarda uyumsuzluk tespit edildi:\n\n" + "\n".join(incompatible_list)
@@ -325,26 +340,34 @@ class App(tk.Tk):
                 self.after(0, lambda: self.add_to_monitor(incompatible_rows))
 
     def add_background_results(self, rows):
-        new_df = pd.DataFrame(rows)
-        if self.full_df is None or self.full_df.empty:
-            self.full_df = new_df
-        else:
-            self.full_df = pd.concat([self.full_df, new_df]).drop_duplicates(subset=['İstasyon', 'date', 'Bülten']).sort_values(by='_dt', ascending=False)
+        # full_df manuel analizle değiştiyse kimlik kümesini yeniden kur
+        if self.full_ids_df is not self.full_df:
+            self.full_ids = set(self.full_df["_id"]) if self.full_df is not None and "_id" in self.full_df.columns else set()
+
+        new_rows = filter_new_records(rows, self.full_ids)
+        if new_rows:
+            new_df = pd.DataFrame(new_rows)
+            if self.full_df is None or self.full_df.empty:
+                self.full_df = new_df
+            else:
+                self.full_df = pd.concat([self.full_df, new_df]).sort_values(by='_dt', ascending=False)
         
+        self.full_ids_df = self.full_df
         self.update_tree(self.full_df)
 
     def add_to_monitor(self, rows):
         """Uyumsuzluk takip listesine veri ekler."""
-        new_df = pd.DataFrame(rows)
-        if self.incompatible_df is None or self.incompatible_df.empty:
-            self.incompatible_df = new_df
-        else:
-            self.incompatible_df = pd.concat([self.incompatible_df, new_df])
-            self.incompatible_df = self.incompatible_df.drop_duplicates(subset=['İstasyon', 'date', 'Bülten'])
-        
-        # Yeniden eskiye sırala
-        if '_dt' in self.incompatible_df.columns:
-            self.incompatible_df = self.incompatible_df.sort_values(by='_dt', ascending=False)
+        new_rows = filter_new_records(rows, self.incompatible_ids)
+        if new_rows:
+            new_df = pd.DataFrame(new_rows)
+            if self.incompatible_df is None or self.incompatible_df.empty:
+                self.incompatible_df = new_df
+            else:
+                self.incompatible_df = pd.concat([self.incompatible_df, new_df])
+            
+            # Yeniden eskiye sırala
+            if '_dt' in self.incompatible_df.columns:
+                self.incompatible_df = self.incompatible_df.sort_values(by='_dt', ascending=False)
             
         if self.monitor_window and tk.Toplevel.winfo_exists(self.monitor_window):
             self.refresh_monitor_tree()
@@ -648,28 +671,23 @@ class App(tk.Tk):
             incompatible_list = []
             total = len(TURKEY_STATIONS)
             
-            for i, code in enumerate(TURKEY_STATIONS.keys(), 1):
+            self.after(0, lambda: lbl_map_status.config(text=f"Taranıyor (0/{total})...", fg="#FFD740"))
+            
+            # Eski TAF'ı da yakalamak için en geniş pencere tek istekte çekilir (Arşivde olan kısım indirilmez).
+            # Son METAR'a göre en güncel TAF seçildiği için dar pencerelerle aynı sonucu verir.
+            # İstasyonlar paralel çekilir; harita tamamlanan istasyon sırasıyla güncellenir
+            s_dt = now - timedelta(hours=HARITA_TAF_GERIYE_SAAT)
+            results = RASATLAR.fetch_many(TURKEY_STATIONS.keys(), s_dt, e_dt, timeout=10, fetch_func=bulten_arsivi.fetch, include_synop=False)
+            for i, (code, lines) in enumerate(results, 1):
                 self.after(0, lambda c=code, idx=i: lbl_map_status.config(text=f"Taranıyor ({idx}/{total}): {c}...", fg="#FFD740"))
                 
                 try:
-                    lines = []
-                    # TAF bulana kadar geriye dönük tarama (Max 30 saat)
-                    for hours_back in range(6, 31, 6):
-                        s_dt = now - timedelta(hours=hours_back)
-                        
-                        lines = RASATLAR.fetch(s_dt, e_dt, station=code, timeout=10)
-                        if lines:
-                            # TAF var mı kontrol et
-                            df_check = process_data(lines, code, "", ref_dt=e_dt)
-                            if not df_check[df_check['Türü'] == 'TAF'].empty:
-                                break # TAF bulundu
-
                     color = "#455A64" # Veri yok (Gri)
                     status_msg = "Veri Yok"
                     detail_data = None
                     
                     if lines:
-                        df = process_data(lines, code, "", ref_dt=e_dt)
+                        df = process_data(lines, code, "", ref_dt=e_dt, with_date=False)
                         tafs = df[df['Türü'] == 'TAF'].sort_values(by='_dt')
                         metars = df[df['Türü'].isin(['METAR', 'SPECI'])].sort_values(by='_dt')
                         
@@ -688,7 +706,7 @@ class App(tk.Tk):
                                 tr_m = re.search(r'\b(BECMG|TEMPO|NOSIG)\b', metar_txt)
                                 if tr_m: trend_part = metar_txt[tr_m.start():]
                                 
-                                skor, status_code, reasons = robot.analiz_et(taf_txt, metar_txt, trend_part)
+                                skor, status_code, reasons = robot.analiz_et(taf_txt, metar_txt, trend_part, ref_date=last_metar['_dt'], taf_dt=target_taf['_dt'])
                                 
                                 # Detay Metni Oluştur
                                 detay_str = ""
@@ -717,7 +735,7 @@ class App(tk.Tk):
                                     'metar': metar_txt,
                                     'taf': taf_txt,
                                     'detail': detay_str,
-                                    'date': last_metar['date']
+                                    'date': last_metar['_dt'].strftime("%d.%m.%Y %H:%M")
                                 }
                     
                     # Haritayı Güncelle
@@ -782,26 +800,16 @@ class App(tk.Tk):
 
     def worker(self, st, wmo, s_dt, e_dt):
         try:
-            all_lines = []
-            curr_end = e_dt
+            # Ogimet genellikle 30-31 günlük veri verir. Uzun aralıklar istasyonun bülten yoğunluğuna
+            # göre parçalara bölünüp paralel çekilir. Kesilen yanıtlar RASATLAR.fetch içinde tamamlanır.
+            # İstekler arası bekleme RASATLAR sunucu limitleyicisi tarafından yapılır.
+            chunks = RASATLAR.plan_adaptive(st, s_dt, e_dt)
             
-            # Ogimet genellikle 30-31 günlük veri verir. Uzun aralıklar for döngü kuruyoruz.
-            while curr_end > s_dt:
-                curr_start = curr_end - timedelta(days=30)
-                if curr_start < s_dt:
-                    curr_start = s_dt
-                
-                self.after(0, lambda s=curr_start, e=curr_end: self.lbl_status.config(text=f"Çekiliyor: {s.strftime('%d.%m.%Y')} - {e.strftime('%d.%m.%Y')}", fg="#FFD740"))
-                
-                try:
-                    chunk_lines = RASATLAR.fetch(curr_start, curr_end, station=st, wmo_id=wmo)
-                    if chunk_lines:
-                        all_lines.extend(chunk_lines)
-                except Exception as e:
-                    print(f"Veri parça hatası: {e}")
-                
-                curr_end = curr_start - timedelta(seconds=1)
-                time.sleep(0.5) # Sunucuyu yormamak for bekleme
+            def on_progress(done, total, chunk):
+                s, e = chunk
+                self.after(0, lambda: self.lbl_status.config(text=f"Çekiliyor ({done}/{total}): {s.strftime('%d.%m.%Y')} - {e.strftime('%d.%m.%Y')}", fg="#FFD740"))
+            
+            all_lines = RASATLAR.fetch_chunks(chunks, st, wmo_id=wmo, fetch_func=bulten_arsivi.fetch, on_progress=on_progress)
 
             if not all_lines:
                 self.after(0, lambda: messagebox.showwarning("Veri Bulunamadı", f"Sorgulanan Tarih: {s_dt.strftime('%d.%m.%Y')}\nİstasyon: {st}\n\nOlası Sebepler:\n1. Ogimet sunucusu yanıt vermiyor veya boş dönüyor.\n2. Bu tarihte istasyon veri göndermemiş.\n3. İnternet bağlantısı sorunu.\n\nLütfen terminal penceresindeki DEBUG çıktılarını kontrol edin."))
@@ -822,6 +830,9 @@ class App(tk.Tk):
                 tafs = df[df['Türü'] == 'TAF'].sort_values(by='_dt')
                 
                 if not tafs.empty:
+                    # METAR'ları yöneten TAF'a (3 saat kuralı) göre grupla: her TAF tek analiz_et_batch çağrısıyla değerlendirilir
+                    sonuclar = taf_ile_analiz(robot, df, tafs)
+
                     # Ardışık Exception takibi for sayaçlar
                     last_taf_text = None
                     consecutive_counts = {"Rüzgar": 0, "Görüş": 0, "ceil": 0}
@@ -859,55 +870,7 @@ class App(tk.Tk):
 
                                 df.at[idx, "_ref_taf"] = last_taf
                                 try:
-                                    # TAF Zamanını bul (Örn: 0412/0512)
-                                    # Regex geliştirildi: Gün (01-31) and time (00-24) formatına uygunluk kontrolü. BECMG/TEMPO for de passerli.
-                                    regex_period = r'(?:0[1-9]|[12]\d|3[01])(?:[01]\d|2[0-4])/(?:0[1-9]|[12]\d|3[01])(?:[01]\d|2[0-4])'
-                                    
-                                    t_valid = re.search(r'\b' + regex_period + r'\b', last_taf)
-                                    taf_zaman = t_valid.group(0) if t_valid else "0000/0000"
-                                    
-                                    # FM Gruplarını dikkate alarak aktif splitümü seç
-                                    active_taf = last_taf
-                                    # FM, BECMG and TEMPO gruplarını dikkate alarak aktif splitümü seç
-                                    try:
-                                        best_change_start = -1
-                                        taf_dt = target_row['_dt']
-
-                                        # Sadece FM grupları ana TAF'ı sıfırlar. BECMG/TEMPO trend olarak işlenir.
-                                        change_pattern = r'\bFM(?P<fm>\d{6})\b'
-                                        
-                                        for m in re.finditer(change_pattern, last_taf):
-                                            start_dt = None
-                                            try:
-                                                if m.group('fm'):
-                                                    time_code = m.group('fm')
-                                                    day, hour, minute = int(time_code[0:2]), int(time_code[2:4]), int(time_code[4:6])
-                                                    start_dt = taf_dt.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
-                                                
-                                                if start_dt:
-                                                    # Ay passişi kontrolü
-                                                    if start_dt.day < taf_dt.day and (taf_dt.day - start_dt.day) > 15:
-                                                        if start_dt.month == 12: start_dt = start_dt.replace(year=start_dt.year+1, month=1)
-                                                        else: start_dt = start_dt.replace(month=start_dt.month+1)
-                                                    elif start_dt.day > taf_dt.day and (start_dt.day - taf_dt.day) > 15:
-                                                        if start_dt.month == 1: start_dt = start_dt.replace(year=start_dt.year-1, month=12)
-                                                        else: start_dt = start_dt.replace(month=start_dt.month-1)
-                                                    
-                                                    if start_dt <= metar_dt:
-                                                        best_change_start = max(best_change_start, m.start())
-                                            except (ValueError, IndexError): continue
-
-                                        if best_change_start != -1:
-                                            active_taf = last_taf[best_change_start:]
-                                    except Exception as e:
-                                        print(f"Değişim Grubu Analiz Hatası: {e}")
-
-                                    # Trend kısmını ayır
-                                    trend_part = ""
-                                    tr_m = re.search(r'\b(BECMG|TEMPO|NOSIG)\b', row['Bülten'])
-                                    if tr_m: trend_part = row['Bülten'][tr_m.start():]
-
-                                    skor, status_code, reasons = robot.analiz_et(active_taf, row['Bülten'], trend_part, taf_zaman)
+                                    skor, status_code, reasons, _ = sonuclar[idx]
                                     
                                     # --- ARDIŞIK Exception KONTROLÜ ---
                                     current_cats = set()
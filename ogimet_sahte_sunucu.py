@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+OGIMET YEREL TEST SUNUCUSU
+display_metars2.php ve display_synops2.php uç noktalarını taklit eden küçük bir HTTP sunucusu.
+Arka plan taraması, harita taraması ve Streamlit uygulamalarını yavaş veya hatalı bir
+Ogimet'e karşı (tekrarlanabilir şekilde) denemek için kullanılır.
+
+Kullanım:
+    python ogimet_sahte_sunucu.py --port 8765 --gecikme 800 --hata-orani 0.1
+    python ogimet_sahte_sunucu.py --kaynak arsiv --arsiv-dizini ham_yanitlar   (Ham yanıt arşivinden yanıt ver)
+
+Uygulamayı bu sunucuya yönlendirmek için:
+    OGIMET_BASE_URL=http://127.0.0.1:8765 python ogimet_icao_analiz.py
+    veya kod içinden: RASATLAR.set_base_url("http://127.0.0.1:8765")
+"""
+
+import time
+import random
+import argparse
+import threading
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit, parse_qsl
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import ham_arsiv
+
+# =============================================================================
+# SENTETİK VERİ
+# =============================================================================
+def sentetik_satirlar(istasyon, baslangic, bitis, metar_dk=30):
+    """
+    Ogimet çıktısına benzeyen METAR/SPECI/TAF satırları üretir (Yeniden eskiye).
+    Aynı aralık için her zaman aynı satırlar üretilir (Tekrarlanabilir ölçüm için).
+    """
+    lines = []
+    t = bitis.replace(second=0, microsecond=0)
+    t -= timedelta(minutes=t.minute % 10)
+    while t >= baslangic:
+        dakika = t.hour * 60 + t.minute
+        if dakika % metar_dk == 20 % metar_dk:
+            lines.append(f"{t:%Y%m%d%H%M} METAR {istasyon} {t:%d%H%M}Z {(t.hour * 10) % 360:03d}{5 + t.hour % 15:02d}KT 9999 SCT030 BKN100 08/03 Q1015 NOSIG=")
+        if t.minute == 0 and t.hour % 3 == 2:
+            lines.append(f"{t:%Y%m%d%H%M} SPECI {istasyon} {t:%d%H%M}Z 24018G28KT 3000 -SHRA BKN012 07/05 Q1012 BECMG 9999=")
+        if t.minute == 0 and t.hour % 6 == 5:
+            v = t + timedelta(hours=1)
+            lines.append(f"{t:%Y%m%d%H%M} TAF {istasyon} {t:%d%H%M}Z {v:%d%H}/{v + timedelta(hours=24):%d%H} 20010KT 9999 SCT030")
+            lines.append(f"                 BECMG {v + timedelta(hours=2):%d%H}/{v + timedelta(hours=4):%d%H} 25015KT 6000 -RA BKN015")
+            lines.append(f"                 TEMPO {v + timedelta(hours=6):%d%H}/{v + timedelta(hours=10):%d%H} 4000 SHRA BKN010=")
+        t -= timedelta(minutes=10)
+    return lines
+
+def sentetik_synop_satirlari(wmo_id, baslangic, bitis):
+    """display_synops2.php (fmt=txt) düzeninde 3 saatlik SYNOP satırları üretir."""
+    lines = []
+    t = bitis.replace(minute=0, second=0, microsecond=0)
+    t -= timedelta(hours=t.hour % 3)
+    while t >= baslangic:
+        lines.append(f"{wmo_id},{t:%Y,%m,%d,%H},00,AAXX {t:%d%H}1 {wmo_id} 32970 72010 10080 20030 39950 40150 58010 333 10120=")
+        t -= timedelta(hours=3)
+    return lines
+
+def metar_sayfasi(lines, dolgu_kb=0):
+    """Satırları display_metars2.php düzenine benzer HTML sayfasına çevirir (bytes)."""
+    govde = "\n".join(f'<tr><td>&nbsp;</td><td><pre>{l.replace("=", "&#61;")}</pre></td></tr>' for l in lines)
+    dolgu = "<!-- " + "x" * (dolgu_kb * 1024) + " -->" if dolgu_kb else ""
+    sayfa = (
+        '<html><head><title>Ogimet</title><script>var cookieconsent = {};</script></head><body>'
+        f'{dolgu}<h1>Consulta de METAR &amp; TAF</h1><table>{govde}</table></body></html>'
+    )
+    return sayfa.encode("utf-8")
+
+def _sorgu_araligi(params):
+    """Ogimet parametrelerinden (ano, mes, day, hora, min ...) başlangıç/bitiş tarihlerini çıkarır."""
+    def dt(y, m, d, h, mi):
+        return datetime(int(params[y]), int(params[m]), int(params[d]), int(params[h]), int(params[mi]))
+    return dt("ano", "mes", "day", "hora", "min"), dt("anof", "mesf", "dayf", "horaf", "minf")
+
+# =============================================================================
+# HTTP SUNUCUSU
+# =============================================================================
+class SahteOgimet(BaseHTTPRequestHandler):
+    """İstek işleyici. Ayarlar sunucu nesnesindeki 'ayar' sözlüğünden okunur."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        if not self.server.ayar["sessiz"]:
+            super().log_message(format, *args)
+
+    def _yanit(self, status, body, content_type="text/html; charset=utf-8"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        ayar = self.server.ayar
+        parca = urlsplit(self.path)
+        params = dict(parse_qsl(parca.query))
+
+        with self.server.kilit:
+            self.server.istek_sayisi += 1
+
+        # Gecikme (ms, +/- sapma)
+        gecikme = max(0.0, random.gauss(ayar["gecikme"], ayar["sapma"])) / 1000.0
+        if gecikme: time.sleep(gecikme)
+
+        # Hata enjeksiyonu
+        if random.random() < ayar["hata_orani"]:
+            self._yanit(random.choice([500, 502, 503]), b"<html><body>Service unavailable</body></html>")
+            return
+
+        if parca.path not in ("/display_metars2.php", "/display_synops2.php"):
+            self._yanit(404, b"not found")
+            return
+
+        if ayar["kaynak"] == "arsiv":
+            try:
+                r = ham_arsiv.yukle(parca.path, params)
+            except ham_arsiv.ArsivdeYok:
+                self._yanit(404, b"<html><body>No recorded response</body></html>")
+                return
+            self._yanit(r.status_code, r.content, f"text/html; charset={r.encoding or 'utf-8'}")
+            return
+
+        try:
+            baslangic, bitis = _sorgu_araligi(params)
+        except (KeyError, ValueError):
+            self._yanit(400, b"<html><body>Bad query</body></html>")
+            return
+
+        lugar = params.get("lugar", "XXXX")
+        if parca.path == "/display_synops2.php":
+            lines = sentetik_synop_satirlari(lugar, baslangic, bitis)
+            body = ("# SYNOP\n" + "\n".join(lines) + "\n").encode("utf-8")
+            self._yanit(200, body, "text/plain; charset=utf-8")
+            return
+
+        lines = sentetik_satirlar(lugar, baslangic, bitis, metar_dk=ayar["metar_dk"])
+        if ayar["satir_limiti"]:
+            lines = lines[:ayar["satir_limiti"]] # Ogimet'in büyük yanıtları kesmesini taklit eder
+        self._yanit(200, metar_sayfasi(lines, ayar["dolgu_kb"]))
+
+def sunucu_olustur(host="127.0.0.1", port=8765, gecikme=0, sapma=0, hata_orani=0.0, kaynak="sentetik",
+                   metar_dk=30, satir_limiti=0, dolgu_kb=0, sessiz=False):
+    """Sunucu nesnesini oluşturur (Testlerde thread içinde serve_forever ile çalıştırılabilir)."""
+    server = ThreadingHTTPServer((host, port), SahteOgimet)
+    server.daemon_threads = True
+    server.kilit = threading.Lock()
+    server.istek_sayisi = 0
+    server.ayar = {
+        "gecikme": gecikme, "sapma": sapma, "hata_orani": hata_orani, "kaynak": kaynak,
+        "metar_dk": metar_dk, "satir_limiti": satir_limiti, "dolgu_kb": dolgu_kb, "sessiz": sessiz,
+    }
+    return server
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Ogimet yerel test sunucusu")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--gecikme", type=float, default=0, help="Ortalama yanıt gecikmesi (ms)")
+    ap.add_argument("--sapma", type=float, default=0, help="Gecikme standart sapması (ms)")
+    ap.add_argument("--hata-orani", type=float, default=0.0, help="5xx dönen istek oranı (0-1)")
+    ap.add_argument("--kaynak", choices=["sentetik", "arsiv"], default="sentetik")
+    ap.add_argument("--metar-dk", type=int, default=30, help="Sentetik METAR aralığı (dakika)")
+    ap.add_argument("--satir-limiti", type=int, default=0, help="Yanıt başına en fazla satır (0: sınırsız)")
+    ap.add_argument("--dolgu-kb", type=int, default=0, help="Sayfaya eklenecek HTML dolgusu (KB)")
+    ap.add_argument("--arsiv-dizini", default=None, help="--kaynak arsiv için ham yanıt arşivi (Varsayılan: HAM_ARSIV_DIZINI)")
+    ap.add_argument("--sessiz", action="store_true")
+    a = ap.parse_args()
+    if a.arsiv_dizini: ham_arsiv.ayarla(dizin=a.arsiv_dizini)
+
+    server = sunucu_olustur(a.host, a.port, a.gecikme, a.sapma, a.hata_orani, a.kaynak,
+                            a.metar_dk, a.satir_limiti, a.dolgu_kb, a.sessiz)
+    print(f"Ogimet test sunucusu: http://{a.host}:{a.port} (kaynak={a.kaynak}, gecikme={a.gecikme}ms, hata={a.hata_orani})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
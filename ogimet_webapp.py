@@ -7,13 +7,12 @@ Bu dosya, masaüstü uygulamasının web versiyonudur.
 
 import streamlit as st
 import pandas as pd
-import re
 from datetime import datetime, timedelta, timezone
-import RASATLAR
+import bulten_arsivi
 import TAF_METAR_TREND
 import io
 import plotly.express as px
-from veri_isleme import process_data
+from veri_isleme import process_data, taf_ile_analiz
 from ayarlar import TURKEY_STATIONS
 
 # Sayfa Ayarları
@@ -40,6 +39,9 @@ def analyze_dataframe(df):
     tafs = df[df['Türü'] == 'TAF'].sort_values(by='_dt')
     if tafs.empty: return df
 
+    # METAR'ları yöneten TAF'a (3 saat kuralı) göre grupla: her TAF tek analiz_et_batch çağrısıyla değerlendirilir
+    sonuclar = taf_ile_analiz(robot, df, tafs)
+
     last_taf_text = None
     consecutive_counts = {"Rüzgar": 0, "Görüş": 0, "ceil": 0}
 
@@ -62,50 +64,7 @@ def analyze_dataframe(df):
 
                 df.at[idx, "_ref_taf"] = last_taf
                 
-                # TAF Zamanı
-                regex_period = r'(?:0[1-9]|[12]\d|3[01])(?:[01]\d|2[0-4])/(?:0[1-9]|[12]\d|3[01])(?:[01]\d|2[0-4])'
-                t_valid = re.search(r'\b' + regex_period + r'\b', last_taf)
-                taf_zaman = t_valid.group(0) if t_valid else "0000/0000"
-
-                # FM Gruplarını dikkate alarak aktif bölümü seç
-                active_taf = last_taf
-                try:
-                    best_change_start = -1
-                    
-                    # Sadece FM grupları ana TAF'ı sıfırlar. BECMG/TEMPO trend olarak işlenir.
-                    change_pattern = r'\bFM(?P<fm>\d{6})\b'
-                    
-                    for m in re.finditer(change_pattern, last_taf):
-                        start_dt = None
-                        try:
-                            if m.group('fm'):
-                                time_code = m.group('fm')
-                                day, hour, minute = int(time_code[0:2]), int(time_code[2:4]), int(time_code[4:6])
-                                start_dt = taf_dt.replace(day=day, hour=hour, minute=minute, second=0, microsecond=0)
-                            
-                            if start_dt:
-                                # Ay geçişi kontrolü
-                                if start_dt.day < taf_dt.day and (taf_dt.day - start_dt.day) > 15:
-                                    if start_dt.month == 12: start_dt = start_dt.replace(year=start_dt.year+1, month=1)
-                                    else: start_dt = start_dt.replace(month=start_dt.month+1)
-                                elif start_dt.day > taf_dt.day and (start_dt.day - taf_dt.day) > 15:
-                                    if start_dt.month == 1: start_dt = start_dt.replace(year=start_dt.year-1, month=12)
-                                    else: start_dt = start_dt.replace(month=start_dt.month-1)
-                                
-                                if start_dt <= metar_dt:
-                                    best_change_start = max(best_change_start, m.start())
-                        except (ValueError, IndexError): continue
-
-                    if best_change_start != -1:
-                        active_taf = last_taf[best_change_start:]
-                except Exception as e: pass
-
-                # Trend
-                trend_part = ""
-                tr_m = re.search(r'\b(BECMG|TEMPO|NOSIG)\b', row['Bülten'])
-                if tr_m: trend_part = row['Bülten'][tr_m.start():]
-
-                skor, status_code, reasons = robot.analiz_et(active_taf, row['Bülten'], trend_part, taf_zaman)
+                skor, status_code, reasons, _ = sonuclar[idx]
 
                 # Ardışık Hata Kontrolü
                 current_cats = set()
@@ -174,7 +133,7 @@ if st.sidebar.button("VERİ ÇEK & ANALİZ ET", type="primary"):
         e_dt = datetime.combine(end_date, datetime.max.time())
         
         try:
-            lines = RASATLAR.fetch(s_dt, e_dt, station=station, wmo_id=wmo)
+            lines = bulten_arsivi.fetch(s_dt, e_dt, station=station, wmo_id=wmo)
             if not lines:
                 st.error("Veri bulunamadı.")
                 st.session_state.analiz_sonucu = None
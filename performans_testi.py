@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+"""
+PERFORMANS TESTİ
+Veri çekme/ayrıştırma adımlarının hızını ölçer ve hızlı yolun eski yolla
+aynı sonucu verdiğini kontrol eder.
+
+Kullanım:
+    python performans_testi.py pre                      (Sentetik 30 günlük sayfa)
+    python performans_testi.py pre kayit1.html kayit2.html   (Kayıtlı Ogimet sayfaları)
+    python performans_testi.py isle                     (Sentetik 1 yıllık LTFM verisi, process_data)
+    python performans_testi.py isle 90 730              (Gün sayıları)
+    python performans_testi.py paralel                  (8 istasyon x 2 yıl, process_data_bulk)
+    python performans_testi.py paralel 365 4            (Gün, istasyon sayısı)
+    python performans_testi.py zaman                    (1M DDHHMM kodu, zaman_cozucu tekil/dizi)
+    python performans_testi.py dogrulama 365            (Sentetik METAR'lar, analiz_et_batch / vektorel_dogrulama)
+"""
+
+import io
+import sys
+import time
+import random
+import contextlib
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import RASATLAR
+import veri_isleme
+import zaman_cozucu
+import vektorel_dogrulama
+from bulten import Bulletin
+from TAF_METAR_TREND import HavacilikRobotModulu
+from ayarlar import TURKEY_STATIONS
+from ogimet_sahte_sunucu import sentetik_satirlar, metar_sayfasi
+
+def olc(func, *args, tekrar=5):
+    """Fonksiyonu tekrar kez çalıştırır, en iyi süreyi (sn) ve son sonucu döner."""
+    en_iyi, sonuc = None, None
+    for _ in range(tekrar):
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): # DEBUG çıktılarını sustur
+            sonuc = func(*args)
+        sure = time.perf_counter() - t0
+        en_iyi = sure if en_iyi is None else min(en_iyi, sure)
+    return en_iyi, sonuc
+
+def ornek_satirlar(gun=30, istasyon="LTAN", bitis=None):
+    """Ogimet çıktısına benzeyen sentetik satırlar (Yeniden eskiye)."""
+    bitis = bitis or datetime(2024, 1, 31, 23, 50)
+    return sentetik_satirlar(istasyon, bitis - timedelta(days=gun), bitis)
+
+def ornek_sayfa(gun=30, istasyon="LTAN"):
+    """display_metars2.php düzenine benzeyen sentetik HTML sayfası (bytes)."""
+    return metar_sayfasi(ornek_satirlar(gun, istasyon))
+
+def pre_testi(dosyalar):
+    sayfalar = []
+    for d in dosyalar:
+        with open(d, "rb") as f:
+            sayfalar.append((d, f.read()))
+    if not sayfalar:
+        sayfalar.append(("sentetik_30_gun", ornek_sayfa(30)))
+
+    for ad, icerik in sayfalar:
+        t_bs, r_bs = olc(RASATLAR._parse_metar_page, icerik, "utf-8", False)
+        t_hz, r_hz = olc(RASATLAR._parse_metar_page, icerik, "utf-8", True)
+        ayni = "✅ AYNI" if r_bs == r_hz else "❌ FARKLI"
+        print(f"{ad}: {len(icerik)/1024:.0f} KB | {len(r_hz)} satır | BeautifulSoup {t_bs*1000:.1f} ms | Hızlı yol {t_hz*1000:.1f} ms | x{t_bs/max(t_hz, 1e-9):.1f} | {ayni}")
+
+def isle_testi(argumanlar):
+    gunler = [int(a) for a in argumanlar] or [365]
+    for gun in gunler:
+        lines = ornek_satirlar(gun, "LTFM", datetime(2024, 12, 31, 23, 50))
+        t, df = olc(veri_isleme.process_data, lines, "LTFM", "17060", tekrar=3)
+        print(f"{gun} gün: {len(lines)} satır -> {len(df)} kayıt | {t*1000:.0f} ms | {len(lines)/t/1000:.0f}k satır/sn")
+
+def paralel_testi(argumanlar):
+    gun = int(argumanlar[0]) if argumanlar else 730
+    adet = int(argumanlar[1]) if len(argumanlar) > 1 else 8
+    bitis = datetime(2024, 12, 31, 23, 50)
+    streams = {st: ("", ornek_satirlar(gun, st, bitis)) for st in list(TURKEY_STATIONS)[:adet]}
+    toplam = sum(len(l) for _, l in streams.values())
+
+    t0 = time.perf_counter()
+    sirali = {st: veri_isleme.process_data(l, st, w, ref_dt=bitis) for st, (w, l) in streams.items()}
+    t_sirali = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    paralel = veri_isleme.process_data_bulk(streams, ref_dt=bitis)
+    t_paralel = time.perf_counter() - t0
+
+    ayni = "✅ AYNI" if all(sirali[st].equals(paralel[st]) for st in streams) else "❌ FARKLI"
+    print(f"{adet} istasyon x {gun} gün: {toplam} satır | Sıralı {t_sirali:.2f} sn | Süreç havuzu {t_paralel:.2f} sn | x{t_sirali/max(t_paralel, 1e-9):.1f} | {ayni}")
+
+def zaman_testi(argumanlar):
+    adet = int(argumanlar[0]) if argumanlar else 1000000
+    r = random.Random(0)
+    bas = datetime(2020, 1, 1)
+    refler = [bas + timedelta(minutes=r.randrange(5 * 365 * 1440)) for _ in range(adet)]
+    kodlar = [((ref + timedelta(minutes=r.randrange(-3000, 3000))).day, r.randrange(24), r.randrange(60)) for ref in refler]
+    g, s, d = (np.array(x) for x in zip(*kodlar))
+    ref_dizi = np.array(refler, dtype="datetime64[us]")
+
+    for kural in (zaman_cozucu.YERINE, zaman_cozucu.TASMA):
+        t_tekil, tekil = olc(lambda: [zaman_cozucu.en_yakin(*k, ref, kural) for k, ref in zip(kodlar, refler)], tekrar=1)
+        t_dizi, dizi = olc(zaman_cozucu.en_yakin_dizi, g, s, d, ref_dizi, kural, tekrar=3)
+        ayni = "✅ AYNI" if (np.array(tekil, dtype="datetime64[us]") == dizi).all() else "❌ FARKLI"
+        print(f"{kural}: {adet} kod | Tekil (önbellekli) {t_tekil*1000:.0f} ms | Dizi (NumPy) {t_dizi*1000:.0f} ms | x{t_tekil/max(t_dizi, 1e-9):.1f} | {ayni}")
+
+def dogrulama_testi(argumanlar):
+    gun = int(argumanlar[0]) if argumanlar else 365
+    lines = ornek_satirlar(gun, "LTFM", datetime(2024, 12, 31, 23, 50))
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = veri_isleme.process_data(lines, "LTFM", "17060").sort_values("_dt")
+    tafs = df[df["Türü"] == "TAF"]
+    metars = df[df["Türü"].isin(["METAR", "SPECI"])]
+    taf_idx = np.searchsorted(tafs["_dt"].values, metars["_dt"].values, side="right") - 1
+
+    gruplar = []
+    for t in np.unique(taf_idx[taf_idx >= 0]):
+        taf = tafs.iloc[t]
+        gruplar.append((taf["Bülten"], taf["_dt"], [Bulletin.from_record(r) for _, r in metars[taf_idx == t].iterrows()]))
+    adet = sum(len(m) for _, _, m in gruplar)
+
+    # Robotlar ölçüm dışında kurulur; ikisi de boş önbellekle başlar (Biri diğerinin önbelleğini ısıtmasın)
+    with contextlib.redirect_stdout(io.StringIO()):
+        robot_batch, robot = HavacilikRobotModulu(), HavacilikRobotModulu()
+    t_batch, batch = olc(lambda: [s for g in gruplar for s in robot_batch.analiz_et_batch(g[0], g[2], taf_dt=g[1])], tekrar=1)
+    t_cikar, oz = olc(vektorel_dogrulama.ozellikleri_cikar, robot, gruplar, tekrar=1)
+    t_deg, vek = olc(vektorel_dogrulama.degerlendir, robot, oz, tekrar=3)
+    ayni = "✅ AYNI" if [(s, d) for s, d, _, _ in batch] == list(zip(vek["skor"].tolist(), vek["durum"].tolist())) else "❌ FARKLI"
+    print(f"{gun} gün: {adet} METAR, {len(gruplar)} TAF | analiz_et_batch {t_batch*1000:.0f} ms | Çıkarma {t_cikar*1000:.0f} ms | Değerlendirme (NumPy) {t_deg*1000:.1f} ms | {ayni}")
+
+TESTLER = {
+    "pre": pre_testi,
+    "isle": isle_testi,
+    "paralel": paralel_testi,
+    "zaman": zaman_testi,
+    "dogrulama": dogrulama_testi,
+}
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in TESTLER:
+        print(__doc__)
+        sys.exit(1)
+    TESTLER[sys.argv[1]](sys.argv[2:])
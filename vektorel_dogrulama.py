@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+"""
+VEKTÖREL DOĞRULAMA
+Uzun dönem (çok istasyon, aylar) TAF doğrulaması için sütunsal özellik tablosu ve
+NumPy karşılaştırma motoru. Her METAR ve derlenmiş TAF dönemi bir kez çözülüp
+yon/hiz/hamle/gorus/tavan/vv/hadise sütunlarına yazılır; _compare_values kuralları
+(>= 10 KT hız, >= 60° yön, esikler_ruyet/esikler_tavan geçişi, hadise farkı) bütün
+diziler üzerinde tek seferde uygulanır. Eşik geçişleri searchsorted kutularıyla bulunur.
+
+dogrula(), analiz_et ile aynı skor/durum kararını (Ana kısım, BECMG bitişi, TAF trendi,
+90 dk tampon, METAR trendi) METAR dizisinin tamamı için verir; neden metni üretmez,
+ana kısım karşılaştırmasının kural bayraklarını döner.
+
+Kullanım:
+    from vektorel_dogrulama import dogrula
+    sonuc = dogrula(robot, [(taf_bulteni, None, metar_bultenleri), ...])
+    sonuc["skor"], sonuc["durum"], sonuc["gorus"] ...
+"""
+
+import re
+from datetime import datetime
+
+import numpy as np
+
+from bulten import Bulletin, metni
+from zaman_cozucu import en_yakin_dizi, TASMA
+
+SUTUNLAR = ("yon", "hiz", "hamle", "gorus", "tavan", "vv", "hadise", "gecerli")
+BAYRAKLAR = ("ruzgar_hiz", "ruzgar_yon", "gorus", "tavan", "dikey_gorus", "hadise")
+
+TUR_BECMG, TUR_TEMPO = 1, 2
+_TURLER = {"BECMG": TUR_BECMG, "TEMPO": TUR_TEMPO}
+_RE_METAR_ZAMANI = re.compile(r'\b(\d{2})(\d{2})(\d{2})Z\b')
+_RE_METAR_TRENDI = re.compile(r'\b(BECMG|TEMPO|NOSIG)\b')
+_BOS_ZAMAN = np.datetime64("NaT", "us")
+
+def hadise_bitleri(robot):
+    """kritik_hadiseler etiketlerine bit değeri atar ({'TS': 1, 'FZ': 2, ...})."""
+    return {ad: 1 << i for i, ad in enumerate(robot.kritik_hadiseler)}
+
+def ozellik_tablosu(robot, degerler):
+    """
+    (Rüzgar, Görüş, Tavan, Hadise) dörtlülerini (None: okunamadı) sütunsal tabloya çevirir.
+    {sütun: NumPy dizisi} döner; okunamayan satırlarda gecerli False olur.
+    """
+    bit = hadise_bitleri(robot)
+    n = len(degerler)
+    yon, hiz, hamle, gorus, tavan = (np.zeros(n, dtype=np.int64) for _ in range(5))
+    vv, gecerli = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+    hadise = np.zeros(n, dtype=np.int64)
+    for i, d in enumerate(degerler):
+        if d is None: continue
+        (yon[i], hiz[i], hamle[i]), gorus[i], (tavan[i], vv[i]), wx = d
+        hadise[i] = sum(bit[w] for w in wx)
+        gecerli[i] = True
+    return {"yon": yon, "hiz": hiz, "hamle": hamle, "gorus": gorus, "tavan": tavan, "vv": vv, "hadise": hadise, "gecerli": gecerli}
+
+def sec(tablo, idx):
+    """Tablonun idx satırlarından yeni tablo döner."""
+    return {k: v[idx] for k, v in tablo.items()}
+
+def _esik_gecildi(esikler, a, b):
+    """a ile b arasında bir eşik geçildi mi? (low < th <= high, searchsorted kutuları)"""
+    esikler = np.sort(np.asarray(esikler))
+    return np.searchsorted(esikler, a, side="right") != np.searchsorted(esikler, b, side="right")
+
+def karsilastir(robot, t, m):
+    """
+    _compare_values'ın dizi hali: t (Beklenen) ve m (METAR) tablolarını satır satır kıyaslar.
+    Kural bayrakları ve herhangi bir hata için "hata" dizisini döner.
+    """
+    ruzgar_hiz = np.abs(t["hiz"] - m["hiz"]) >= 10
+    yon_f = np.abs(t["yon"] - m["yon"])
+    yon_f = np.where(yon_f > 180, 360 - yon_f, yon_f)
+    ruzgar_yon = (yon_f >= 60) & ((t["hiz"] >= 10) | (m["hiz"] >= 10))
+    gorus = _esik_gecildi(robot.esikler_ruyet, t["gorus"], m["gorus"])
+    tavan_gecis = _esik_gecildi(robot.esikler_tavan, t["tavan"], m["tavan"])
+    dikey = t["vv"] | m["vv"]
+    hadise = (t["hadise"] ^ m["hadise"]) != 0
+    return {"ruzgar_hiz": ruzgar_hiz, "ruzgar_yon": ruzgar_yon, "gorus": gorus,
+            "tavan": tavan_gecis & ~dikey, "dikey_gorus": tavan_gecis & dikey, "hadise": hadise,
+            "hata": ruzgar_hiz | ruzgar_yon | gorus | tavan_gecis | hadise}
+
+def _herhangi(idx, bayrak, n):
+    """Çift dizisindeki bayrakları METAR başına OR'lar."""
+    return np.bincount(idx[bayrak], minlength=n) > 0
+
+def ozellikleri_cikar(robot, gruplar, ref_date=None):
+    """
+    gruplar: (taf_raw, taf_dt, metars) üçlüleri (analiz_et_batch ile aynı girdiler).
+    METAR'ları (düzleştirilmiş sırayla), METAR trendlerini, TAF bölümlerini ve trendlerini
+    sütunsal tablolara çözer. Çıktı degerlendir() ile eşikler değişse de yeniden kullanılabilir.
+    """
+    if hasattr(ref_date, "to_pydatetime"): ref_date = ref_date.to_pydatetime()
+    if ref_date is None: ref_date = datetime.utcnow()
+
+    # --- 1. ÇÖZME (Bülten başına bir kez, robotun önbellekli yardımcılarıyla) ---
+    bolum_deg, bolum_id, bolumler = [], {}, [] # bolumler: id() anahtarlarının geçerli kalması için
+    tr_deg, tr_bolum, tr_tur, tr_bas, tr_bit = [], [], [], [], []
+    m_deg, mt_deg, m_bolum, m_trend, m_becmg = [], [], [], [], []
+    m_gun, m_saat, m_dk, m_ref = [], [], [], []
+
+    for taf_raw, taf_dt, metars in gruplar:
+        metars = list(metars)
+        if not metars: continue
+        ilk = metars[0].issued if isinstance(metars[0], Bulletin) else None
+        cizelge = robot.taf_derle(taf_raw, taf_dt, ilk or ref_date) if metni(taf_raw) else None
+
+        for m in metars:
+            metar_txt = metni(m)
+            ref = m.issued if isinstance(m, Bulletin) and m.issued is not None else ref_date
+            b = cizelge.bolum(ref) if cizelge and metar_txt else None
+            if b is not None and id(b) not in bolum_id:
+                bolum_id[id(b)] = len(bolum_deg)
+                bolumler.append(b)
+                bolum_deg.append(b.ana.degerler)
+                for tr in b.trendler:
+                    tr_deg.append(tr.degerler)
+                    tr_bolum.append(bolum_id[id(b)])
+                    tr_tur.append(_TURLER.get(tr.tur, 0))
+                    tr_bas.append(tr.baslangic)
+                    tr_bit.append(tr.bitis)
+            m_bolum.append(-1 if b is None else bolum_id[id(b)])
+
+            vals = robot._metar_degerleri(robot._extract_body(metar_txt)) if metar_txt else None
+            m_deg.append(vals)
+            tr_m = _RE_METAR_TRENDI.search(metar_txt) if metar_txt else None
+            trend_raw = metar_txt[tr_m.start():] if tr_m else ""
+            m_trend.append(bool(trend_raw))
+            m_becmg.append("BECMG" in trend_raw)
+            mt_deg.append(robot._trend_degerleri(trend_raw, vals) if trend_raw and vals else vals)
+
+            zm = _RE_METAR_ZAMANI.search(metar_txt) if metar_txt else None
+            if zm: m_gun.append(int(zm.group(1))); m_saat.append(int(zm.group(2))); m_dk.append(int(zm.group(3)))
+            else: m_gun.append(-1); m_saat.append(0); m_dk.append(0)
+            m_ref.append(ref)
+
+    M, MT, B = ozellik_tablosu(robot, m_deg), ozellik_tablosu(robot, mt_deg), ozellik_tablosu(robot, bolum_deg)
+    R = ozellik_tablosu(robot, tr_deg)
+    m_bolum = np.array(m_bolum, dtype=np.int64)
+    m_trend, m_becmg = np.array(m_trend, dtype=bool), np.array(m_becmg, dtype=bool)
+    tr_bolum, tr_tur = np.array(tr_bolum, dtype=np.int64), np.array(tr_tur, dtype=np.int64)
+    tr_bas, tr_bit = np.array(tr_bas, dtype="datetime64[us]"), np.array(tr_bit, dtype="datetime64[us]")
+
+    # METAR saati (DDHHMMZ, ref zamanına göre taşmalı çözüm)
+    m_gun = np.array(m_gun, dtype=np.int64)
+    refler = np.array(m_ref, dtype="datetime64[us]")
+    m_dt = en_yakin_dizi(m_gun, m_saat, m_dk, refler, TASMA)
+    m_dt[m_gun < 0] = _BOS_ZAMAN
+
+    return {"M": M, "MT": MT, "B": B, "R": R, "m_bolum": m_bolum, "m_trend": m_trend, "m_becmg": m_becmg,
+            "m_dt": m_dt, "tr_bolum": tr_bolum, "tr_tur": tr_tur, "tr_bas": tr_bas, "tr_bit": tr_bit}
+
+def degerlendir(robot, oz):
+    """
+    ozellikleri_cikar çıktısını analiz_et karar sırasıyla değerlendirir (Tamamen NumPy).
+    {"skor", "durum", BAYRAKLAR...} dizileri döner; bayraklar TAF ana kısmı ile METAR karşılaştırmasıdır.
+    """
+    M, MT, B, R = oz["M"], oz["MT"], oz["B"], oz["R"]
+    m_bolum, m_trend, m_becmg, m_dt = oz["m_bolum"], oz["m_trend"], oz["m_becmg"], oz["m_dt"]
+    tr_bolum, tr_tur, tr_bas, tr_bit = oz["tr_bolum"], oz["tr_tur"], oz["tr_bas"], oz["tr_bit"]
+    n, bolum_sayisi = len(m_bolum), len(B["gecerli"])
+
+    # --- 2. ANA KISIM ---
+    veri_var = (m_bolum >= 0) & M["gecerli"]
+    bi = np.where(m_bolum >= 0, m_bolum, 0)
+    T = sec(B, bi) if bolum_sayisi else {k: np.zeros(n, dtype=v.dtype) for k, v in M.items()}
+    veri_var &= T["gecerli"]
+    ana = karsilastir(robot, T, M)
+    uyumlu = veri_var & ~ana["hata"]
+
+    # --- 3. TREND ÇİFTLERİ (Her METAR x bölümünün trendleri) ---
+    # Trendler bölüm sırasıyla ardışık; her bölümün trend aralığı [bas, bas + adet)
+    adet = np.bincount(tr_bolum, minlength=bolum_sayisi)
+    bas = np.cumsum(adet) - adet
+    c_adet = np.where(veri_var, adet[bi], 0) if bolum_sayisi else np.zeros(n, dtype=np.int64)
+    ci = np.repeat(np.arange(n), c_adet)
+    blok_bas = np.cumsum(c_adet) - c_adet
+    cr = np.repeat(bas[bi] if bolum_sayisi else blok_bas, c_adet) + np.arange(len(ci)) - np.repeat(blok_bas, c_adet)
+
+    trend_uyumlu = ~karsilastir(robot, sec(R, cr), sec(M, ci))["hata"]
+    t_m, t_bas, t_bit, t_tur = m_dt[ci], tr_bas[cr], tr_bit[cr], tr_tur[cr]
+    zamanli, m_zamanli = ~np.isnat(t_bas), ~np.isnat(t_m)
+
+    def aktif(tampon_dk):
+        tampon = np.timedelta64(tampon_dk, "m")
+        tempo = (t_bas - tampon <= t_m) & (t_m <= t_bit + tampon)
+        becmg = t_m >= t_bas - tampon
+        return np.where(t_tur == TUR_TEMPO, tempo, np.where(t_tur == TUR_BECMG, becmg, True))
+
+    # BECMG bitişine 60 dk kala değişim olmadıysa ve METAR trendinde BECMG yoksa DİKKAT
+    kalan = (t_bit - t_m) / np.timedelta64(1, "m")
+    becmg_bitis = (uyumlu[ci] & m_zamanli & ~m_becmg[ci] & (t_tur == TUR_BECMG) & ~np.isnat(t_bit)
+                   & (kalan > 0) & (kalan <= 60) & ~trend_uyumlu)
+    taf_trend = trend_uyumlu & (~zamanli | ~m_zamanli | aktif(0))
+    tampon = trend_uyumlu & zamanli & m_zamanli & aktif(90)
+
+    becmg_bitis, taf_trend, tampon = (_herhangi(ci, x, n) for x in (becmg_bitis, taf_trend, tampon))
+
+    # --- 4. METAR TRENDİ ---
+    metar_trend = m_trend & ~karsilastir(robot, T, MT)["hata"]
+
+    # --- 5. KARAR (analiz_et sırası) ---
+    kosullar = [~veri_var, uyumlu & becmg_bitis, uyumlu, taf_trend, tampon, metar_trend]
+    skor = np.select(kosullar, [0, 50, 100, 100, 50, 50], default=0)
+    durum = np.select(kosullar, ["VERİ BULUNAMADI", "DİKKAT", "UYUMLU", "UYUMLU (TAF Trend)", "DİKKAT", "DİKKAT"], default="UYUMSUZ")
+
+    sonuc = {"skor": skor, "durum": durum}
+    for k in BAYRAKLAR: sonuc[k] = ana[k] & veri_var
+    return sonuc
+
+def dogrula(robot, gruplar, ref_date=None):
+    """ozellikleri_cikar + degerlendir: gruplardaki tüm METAR'ları tek seferde doğrular."""
+    return degerlendir(robot, ozellikleri_cikar(robot, gruplar, ref_date))
@@ -1,136 +1,361 @@
 # -*- coding: utf-8 -*-
 import re
+import hashlib
 import pandas as pd
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor
+from bulten import Bulletin
+from zaman_cozucu import en_yakin
 
-def process_data(lines, station_code, wmo_id, ref_dt=None):
+PARCA_SATIR = 50000  # process_data_bulk: süreç başına yaklaşık satır sayısı
+
+# Ogimet HTML kalıntıları (Satır başı önekleri ve satır içinde geçen metinler)
+_ARTIK_ONEKLERI = ('<', '&lt;', '&nbsp;', 'window.', 'var ', 'function')
+# Satırın ilk iki kelimesi (split() ile aynı boşluk tanımı)
+_RE_ILK_IKI = re.compile(r'(\S+)(?:\s+(\S+))?')
+_RE_WMO_BASLIK = re.compile(r'[A-Z]{4}\d{2}')  # WMO Header (SATT70, FCTT70 vb.)
+_RE_DDHHMMZ = re.compile(r'\b(\d{2})(\d{2})(\d{2})Z\b')
+
+_TURLER = frozenset(("METAR", "TAF", "SPECI"))
+_DEVAM_KELIMELERI = frozenset(("BECMG", "TEMPO", "PROB30", "PROB40", "RMK"))
+_DEVAM_ONEKLERI = ("FM", "TX", "TN")
+
+def _html_artigi_mi(line):
+    # Tek regex yerine str metodları: satır başına ~6 kat daha hızlı
+    return (line.startswith(_ARTIK_ONEKLERI) or 'índice de calor' in line or 'cookieconsent' in line
+            or 'humedad relativa' in line or 'precipitación' in line)
+
+def _kayit_baslangici_mi(tok0, tok1):
+    """Satırın ilk iki kelimesine bakarak yeni kayıt başlangıcı olup olmadığını döner."""
+    # BECMG, TEMPO vb. ile başlayan satırlar kesinlikle devam satırıdır
+    if tok0 in _DEVAM_KELIMELERI or tok0.startswith(_DEVAM_ONEKLERI):
+        return False
+    if len(tok0) == 12 and tok0.isdigit():
+        return True
+    if tok0 in _TURLER:
+        return True
+    if tok1 is not None and len(tok0) == 4 and tok0.isalpha() and tok1.endswith('Z'):
+        return True
+    return _RE_WMO_BASLIK.fullmatch(tok0) is not None
+
+def bulten_kimligi(istasyon, turu, metin, zaman=None):
+    """
+    Bültenin kimlik özeti (blake2b, 8 bayt -> int64). Aynı istasyonun aynı zamanlı, aynı türdeki
+    aynı metni her taramada aynı kimliği alır; ayrıştırma sırasındaki ve uygulamadaki tekilleştirme bunu kullanır.
+    Zaman (Dakika çözünürlüğünde) anahtardadır: metindeki DDHHMMZ ay/yıl içermediği için farklı aylardaki
+    aynı metinli bültenler ancak böyle ayrılır. Zamanı çözülemeyen bültenlerde (None/datetime.min) boş alınır.
+    """
+    z = "" if zaman is None or zaman == datetime.min else f"{zaman:%Y%m%d%H%M}"
+    ozet = hashlib.blake2b(f"{istasyon}\x1f{turu}\x1f{z}\x1f{metin}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(ozet, "big", signed=True)
+
+def _iter_bultenler(lines, station_code, wmo_id, ref_dt, durum=None):
+    """
+    Ayrıştırıcı çekirdeği. Her bülten için (zaman, tür, istasyon, metin) demeti üretir.
+    Zamanı çözülemeyen bültenlerde zaman None olur.
+    durum (sözlük) verilirse açık bülten ve ref_dt oradan okunur, sonda oraya geri yazılır;
+    son (devam satırları gelebilecek) bülten üretilmez (BulletinParser için).
+    """
+    if durum is not None:
+        current, ref_dt = durum["current"], durum["ref_dt"]
+    else:
+        current = None  # [zaman, tür, istasyon, [metin parçaları]]
     if ref_dt is None: ref_dt = datetime.now(timezone.utc).replace(tzinfo=None)
-    data = []
-    current_record = None
+
+    artik = _html_artigi_mi
+    ilk_iki = _RE_ILK_IKI.match
+    baslangic_mi = _kayit_baslangici_mi
 
     for line in lines:
         line = line.strip()
         if not line: continue
-        
+
         # Ogimet HTML kalıntılarını temizle (TAF sonuna yapışan HTML tagleri)
-        if '=' in line:
-            line = line.split('=')[0] + '='
-        
+        esit = line.find('=')
+        if esit != -1:
+            line = line[:esit + 1]
+
         # HTML satırlarını atla
-        if line.startswith(("<", "&lt;", "&nbsp;", "window.", "var ", "function")):
+        if artik(line):
             continue
-        if any(x in line for x in ["índice de calor", "cookieconsent", "humedad relativa", "precipitación"]):
+
+        m_tok = ilk_iki(line)
+        if not baslangic_mi(m_tok.group(1), m_tok.group(2)):
+            # continue satırı (TAF vb. for)
+            if current:
+                current[3].append(line)
             continue
-        
+
+        if current:
+            yield current[0], current[1], current[2], " ".join(current[3])
+
         parts = line.split()
-        is_start = False
-        
-        # Yeni kayıt başlangıcı tespiti
-        if len(parts) > 0:
-            if parts[0].isdigit() and len(parts[0]) == 12:
-                is_start = True
-            elif parts[0] in ["METAR", "TAF", "SPECI"]:
-                is_start = True
-            elif len(parts) > 1 and len(parts[0]) == 4 and parts[0].isalpha() and parts[1].endswith('Z'):
-                is_start = True
-            elif re.match(r'^[A-Z]{4}\d{2}$', parts[0]): # WMO Header (SATT70, FCTT70 vb.)
-                is_start = True
-            
-            # BECMG, TEMPO vb. with başlayan readlinesı kesinlikle continue satırı as işaretle
-            if parts[0] in ["BECMG", "TEMPO", "PROB30", "PROB40", "RMK"] or parts[0].startswith("FM") or parts[0].startswith("TX") or parts[0].startswith("TN"):
-                is_start = False
-        
-        if is_start:
-            if current_record:
-                data.append(current_record)
-            
-            ts_raw = parts[0]
-            dt_str, turu, content = "---", "METAR", line
-            dt_sort = datetime.min
-            
-            if ts_raw.isdigit() and len(ts_raw) == 12:
-                try:
-                    dt = datetime.strptime(ts_raw, "%Y%m%d%H%M")
-                    dt_str = dt.strftime("%d.%m.%Y %H:%M")
-                    dt_sort = dt
-                    ref_dt = dt # Referans tarihi güncelle (Bağlamı koru)
-                except: pass
-                
-                if len(parts) > 1:
-                    p1 = parts[1]
-                    if p1 in ["METAR", "TAF", "SPECI"]:
-                        turu = p1
-                        content = " ".join(parts[2:])
-                    elif p1 == "AAXX":
+        ts_raw = parts[0]
+        turu, content = "METAR", line
+        dt_sort = None
+        m = None
+
+        if len(ts_raw) == 12 and ts_raw.isdigit():
+            try:
+                dt_sort = datetime(int(ts_raw[0:4]), int(ts_raw[4:6]), int(ts_raw[6:8]), int(ts_raw[8:10]), int(ts_raw[10:12]))
+                ref_dt = dt_sort # Referans tarihi güncelle (Bağlamı koru)
+            except ValueError: pass
+
+            if len(parts) > 1:
+                p1 = parts[1]
+                if p1 in _TURLER:
+                    turu = p1
+                    content = " ".join(parts[2:])
+                elif p1 == "AAXX":
+                    turu = "SİNOPTİK"
+                    content = " ".join(parts[1:])
+                else:
+                    # Detaylı SİNOPTİK Tespiti
+                    is_synop = False
+                    if wmo_id and wmo_id in line: is_synop = True
+                    elif " 333 " in line: is_synop = True
+                    elif sum(1 for p in parts if p.isdigit() and len(p) == 5) >= 3: is_synop = True
+
+                    if is_synop:
                         turu = "SİNOPTİK"
-                        content = " ".join(parts[1:])
-                    else:
-                        # Detaylı SİNOPTİK Tespiti
-                        is_synop = False
-                        if wmo_id and wmo_id in line: is_synop = True
-                        elif " 333 " in line: is_synop = True
-                        elif sum(1 for p in parts if p.isdigit() and len(p) == 5) >= 3: is_synop = True
-                        
-                        if is_synop:
-                            turu = "SİNOPTİK"
-                        elif "METAR" in line: turu = "METAR"
-                        elif "TAF" in line: turu = "TAF"
-                        content = " ".join(parts[1:])
-            
-            elif parts[0] in ["METAR", "TAF", "SPECI"]:
-                turu = parts[0]
-                content = " ".join(parts[1:])
-                m = re.search(r'\b(\d{2})(\d{2})(\d{2})Z\b', content)
-                if m:
-                    try:
-                        # Referans tarihe en yakın tarihi bul (Ay geçişlerini yönet)
-                        m_day, m_hour, m_min = int(m.group(1)), int(m.group(2)), int(m.group(3))
-                        candidates = []
-                        for offset in [0, -1, 1]:
-                            y, m_month = ref_dt.year, ref_dt.month + offset
-                            if m_month < 1: m_month += 12; y -= 1
-                            elif m_month > 12: m_month -= 12; y += 1
-                            try: candidates.append(ref_dt.replace(year=y, month=m_month, day=m_day, hour=m_hour, minute=m_min, second=0, microsecond=0))
-                            except: pass
-                        dt_sort = min(candidates, key=lambda x: abs(x - ref_dt)) if candidates else ref_dt
-                        dt_str = dt_sort.strftime("%d.%m.%Y %H:%M")
-                    except: pass
-            
-            elif len(parts) > 1 and len(parts[0]) == 4 and parts[0].isalpha() and parts[1].endswith('Z'):
-                turu = "TAF" if ("TAF" in line or "/" in line) else "METAR"
-                content = line
-                m = re.search(r'\b(\d{2})(\d{2})(\d{2})Z\b', content)
-                if m:
-                    try:
-                        # Referans tarihe en yakın tarihi bul
-                        m_day, m_hour, m_min = int(m.group(1)), int(m.group(2)), int(m.group(3))
-                        candidates = []
-                        for offset in [0, -1, 1]:
-                            y, m_month = ref_dt.year, ref_dt.month + offset
-                            if m_month < 1: m_month += 12; y -= 1
-                            elif m_month > 12: m_month -= 12; y += 1
-                            try: candidates.append(ref_dt.replace(year=y, month=m_month, day=m_day, hour=m_hour, minute=m_min, second=0, microsecond=0))
-                            except: pass
-                        dt_sort = min(candidates, key=lambda x: abs(x - ref_dt)) if candidates else ref_dt
-                        dt_str = dt_sort.strftime("%d.%m.%Y %H:%M")
-                    except: pass
-
-            current_record = {"date": dt_str, "Türü": turu, "İstasyon": station_code if turu!="SİNOPTİK" else wmo_id, "Bülten": content, "_dt": dt_sort}
-        
-        else:
-            # continue satırı (TAF vb. for)
-            if current_record:
-                current_record["Bülten"] += " " + line
-
-    if current_record:
-        data.append(current_record)
-    
-    if not data:
-        return pd.DataFrame(columns=["date", "Türü", "İstasyon", "Bülten", "_dt"])
-    
-    df = pd.DataFrame(data)
+                    elif "METAR" in line: turu = "METAR"
+                    elif "TAF" in line: turu = "TAF"
+                    content = " ".join(parts[1:])
+
+        elif ts_raw in _TURLER:
+            turu = ts_raw
+            content = " ".join(parts[1:])
+            m = _RE_DDHHMMZ.search(content)
+
+        elif len(parts) > 1 and len(ts_raw) == 4 and ts_raw.isalpha() and parts[1].endswith('Z'):
+            turu = "TAF" if ("TAF" in line or "/" in line) else "METAR"
+            content = line
+            m = _RE_DDHHMMZ.search(content)
+
+        if m:
+            # Referans tarihe en yakın tarihi bul
+            dt_sort = en_yakin(int(m.group(1)), int(m.group(2)), int(m.group(3)), ref_dt) or ref_dt
+
+        current = [dt_sort, turu, station_code if turu!="SİNOPTİK" else wmo_id, [content]]
+
+    if durum is not None:
+        durum["current"], durum["ref_dt"] = current, ref_dt
+    elif current:
+        yield current[0], current[1], current[2], " ".join(current[3])
+
+def _bulten(dt, turu, istasyon, content):
+    return Bulletin(istasyon, turu, dt, content, bulten_kimligi(istasyon, turu, content, dt))
+
+def iter_bulletins(lines, station_code, wmo_id, ref_dt=None):
+    """iter_records ile aynı; sözlük yerine Bulletin nesneleri üretir (issued None: tarih çözülemedi)."""
+    for t in _iter_bultenler(lines, station_code, wmo_id, ref_dt):
+        yield _bulten(*t)
+
+def iter_records(lines, station_code, wmo_id, ref_dt=None):
+    """
+    Satırları tek geçişte bültenlere ayırır ve her bülteni devam satırları biter bitmez
+    (bir sonraki bülten başladığında) sözlük olarak üretir.
+    lines herhangi bir iterable olabilir (Parça parça çekilen veriyi bellekte biriktirmeden işlemek için).
+    Tarihi çözülemeyen kayıtlar ("date" == "---", "_dt" == datetime.min) da üretilir; ayıklama tüketiciye bırakılır.
+    """
+    for t in _iter_bultenler(lines, station_code, wmo_id, ref_dt):
+        yield _bulten(*t).to_record()
+
+class BulletinParser:
+    """
+    Artımlı ayrıştırıcı. Açık bülteni ve ref_dt'yi çağrılar arasında saklar; feed() her
+    çağrıda yalnızca yeni tamamlanan veya güncellenen bültenleri (Bulletin listesi) döner.
+
+    Son satırlardaki bülten, devamı gelebileceği için açık tutulur ama yine de üretilir.
+    Devam satırları sonraki partide gelirse metni uzamış olarak (yeni id ile) tekrar üretilir;
+    yerini aldığı sürümün id'si o feed() çağrısından sonra degisenler listesindedir.
+    Aynı dakikadaki farklı bültenler (AMD/COR, iki SPECI) ayrı id'lerle üretilir.
+    """
+    def __init__(self, station_code, wmo_id, ref_dt=None):
+        self.station_code = station_code
+        self.wmo_id = wmo_id
+        self.ref_dt = ref_dt
+        self.current_record = None
+        self._acik_id = None    # Açık bültenin en son üretilen sürümünün kimliği
+        self.degisenler = []    # Son feed() çağrısında yeni sürümü üretilen bültenlerin eski id'leri
+
+    def feed(self, lines):
+        durum = {"current": self.current_record, "ref_dt": self.ref_dt}
+        yeniler, self.degisenler = [], []
+        for t in _iter_bultenler(lines, self.station_code, self.wmo_id, None, durum):
+            b = _bulten(*t)
+            if self._acik_id is not None:
+                # Önceki partiden açık kalan bülten kapandı; değişmediyse zaten üretilmişti
+                acik_id, self._acik_id = self._acik_id, None
+                if b.id == acik_id: continue
+                self.degisenler.append(acik_id)
+            yeniler.append(b)
+        self.current_record, self.ref_dt = durum["current"], durum["ref_dt"]
+
+        if self.current_record:
+            b = _bulten(self.current_record[0], self.current_record[1], self.current_record[2], " ".join(self.current_record[3]))
+            if b.id != self._acik_id:
+                if self._acik_id is not None: self.degisenler.append(self._acik_id)
+                self._acik_id = b.id
+                yeniler.append(b)
+        return yeniler
+
+    def flush(self):
+        """Açık bülteni kapatır; daha önce üretilmemiş bir sürümü varsa döner."""
+        yeniler = self.feed([])
+        self.current_record, self._acik_id = None, None
+        return yeniler
+
+def filter_new_records(records, seen_ids):
+    """
+    Kayıtlardan (sözlük) kimliği seen_ids içinde olmayanları döner ve kümeyi günceller.
+    Birleştirmelerde tüm tabloyu yeniden taramak yerine yalnızca yeni kayıtlar işlenir.
+    """
+    yeni = []
+    for rec in records:
+        kimlik = rec.get("_id")
+        if kimlik is None:
+            kimlik = bulten_kimligi(rec.get("İstasyon"), rec.get("Türü"), rec.get("Bülten"), rec.get("_dt"))
+        if kimlik in seen_ids: continue
+        seen_ids.add(kimlik)
+        yeni.append(rec)
+    return yeni
+
+def taf_ile_analiz(robot, df, tafs=None, kural=timedelta(hours=3)):
+    """
+    df'teki her METAR/SPECI'yi kendinden önceki son TAF'a (en fazla kural kadar eski) bağlar ve
+    her TAF'ın METAR'larını tek robot.analiz_et_batch çağrısıyla değerlendirir.
+    {satır indeksi: (skor, durum, nedenler, kodlar)} döner; TAF'ı olmayan METAR'lar sözlükte yer almaz.
+    """
+    if tafs is None: tafs = df[df['Türü'] == 'TAF'].sort_values(by='_dt')
+    if tafs.empty: return {}
+    metars = df[df['Türü'].isin(['METAR', 'SPECI'])]
+    hedef = tafs['_dt'].searchsorted(metars['_dt'], side='right') - 1
+    gruplar = {}
+    for idx, ti, metar_dt in zip(metars.index, hedef, metars['_dt']):
+        if ti >= 0 and (metar_dt - tafs['_dt'].iat[ti]) <= kural:
+            gruplar.setdefault(ti, []).append(idx)
+    sonuclar = {}
+    for ti, idxs in gruplar.items():
+        taf = tafs.iloc[ti]
+        grup = [Bulletin.from_record(df.loc[i]) for i in idxs]
+        sonuclar.update(zip(idxs, robot.analiz_et_batch(taf['Bülten'], grup, taf_dt=taf['_dt'])))
+    return sonuclar
+
+def add_date_column(df):
+    """Görüntüleme için "date" (GG.AA.YYYY SS:DD) sütununu _dt'den türetip başa ekler."""
+    if "date" not in df.columns:
+        df.insert(0, "date", df["_dt"].dt.strftime("%d.%m.%Y %H:%M"))
+    return df
+
+def _tablo_kur(lines, station_code, wmo_id, ref_dt):
+    """
+    Satırları ayrıştırıp tekilleştirilmiş, akış sırasındaki (sıralanmamış) tabloyu kurar.
+    Veri doğrudan sütun tamponlarına yazılır: Türü/İstasyon kategorik, _dt datetime64.
+    """
+    zamanlar, turler, istasyonlar, bultenler, kimlikler = [], [], [], [], []
+    seen = set()
+    for dt, turu, istasyon, content in _iter_bultenler(lines, station_code, wmo_id, ref_dt):
+        if dt is None: continue
+        # Tekilleştirme ayrıştırma sırasında (İlk görülen kalır)
+        kimlik = bulten_kimligi(istasyon, turu, content, dt)
+        if kimlik in seen: continue
+        seen.add(kimlik)
+        kimlikler.append(kimlik)
+        zamanlar.append(dt)
+        turler.append(turu)
+        istasyonlar.append(istasyon)
+        bultenler.append(content)
+
+    df = pd.DataFrame({
+        "Türü": pd.Categorical(turler),
+        "İstasyon": pd.Categorical(istasyonlar),
+        "Bülten": bultenler,
+        "_dt": pd.to_datetime(zamanlar),
+        "_id": pd.Series(kimlikler, dtype="int64"),
+    })
+    return df
+
+def process_data(lines, station_code, wmo_id, ref_dt=None, with_date=True):
+    """
+    Satırları ayrıştırıp yeniden eskiye sıralı DataFrame döner.
+    with_date=False ise "date" metin sütunu üretilmez (Gerekirse add_date_column ile sonradan eklenir).
+    """
+    df = _tablo_kur(lines, station_code, wmo_id, ref_dt)
     if not df.empty:
-        df = df[df["date"] != "---"]
-        df = df.drop_duplicates(subset=['Türü', 'Bülten'])
         df = df.sort_values(by="_dt", ascending=False)
-    return df
\ No newline at end of file
+    if with_date:
+        df = add_date_column(df)
+    return df
+
+def _guvenli_sinir_mi(line):
+    """
+    Satır geçerli 12 haneli zaman damgasıyla başlayan bir bülten başlangıcıysa True.
+    Böyle bir satırda ayrıştırıcı ref_dt'yi hemen o damgaya çektiği için akış buradan
+    bölünüp parçalar bağımsız ayrıştırıldığında sonuç sıralı ayrıştırmayla aynı olur.
+    """
+    line = line.strip()
+    esit = line.find('=')
+    if esit != -1: line = line[:esit + 1]
+    if not line or _html_artigi_mi(line): return False
+    ts = line.split(None, 1)[0]
+    if len(ts) != 12 or not ts.isdigit(): return False
+    try:
+        datetime(int(ts[0:4]), int(ts[4:6]), int(ts[6:8]), int(ts[8:10]), int(ts[10:12]))
+    except ValueError:
+        return False
+    return True
+
+def split_lines(lines, parca_satir=PARCA_SATIR):
+    """Satır listesini yaklaşık parca_satir uzunluğunda, güvenli bülten sınırlarından parçalara böler."""
+    parcalar, bas = [], 0
+    while bas < len(lines):
+        i = bas + parca_satir
+        while i < len(lines) and not _guvenli_sinir_mi(lines[i]): i += 1
+        parcalar.append(lines[bas:i])
+        bas = i
+    return parcalar
+
+def _parca_isle(args):
+    lines, station_code, wmo_id, ref_dt = args
+    return _tablo_kur(lines, station_code, wmo_id, ref_dt)
+
+def process_data_bulk(streams, ref_dt=None, max_workers=None, parca_satir=PARCA_SATIR):
+    """
+    Çok istasyonlu / çok yıllık ham satırları süreç havuzunda ayrıştırır.
+    streams: {istasyon: (wmo_id, satırlar)}. {istasyon: DataFrame} döner; her tablo
+    aynı satırlarla process_data çağrısının sonucuyla aynıdır (Yeniden eskiye sıralı).
+
+    Kütüphane kullanımı içindir; uygulamalar ve yerel_aktarim çağırmaz (yerel_aktarim dökümleri
+    dosya başına süreç havuzunda okur ve arşive DataFrame değil satır yazar). Süreç başlatma ve
+    parça tablolarının süreçler arası aktarımı sabit maliyet getirdiğinden yalnızca çok çekirdekli
+    makinede ve toplamı birkaç parca_satir'ı aşan (Çok istasyonlu, çok yıllık) girdide kazanç sağlar;
+    tek çekirdekte veya tek taramalık veride process_data daha hızlıdır
+    (Ölçüm: python performans_testi.py paralel).
+    """
+    if ref_dt is None: ref_dt = datetime.now(timezone.utc).replace(tzinfo=None)
+    isler = []
+    for station_code, (wmo_id, lines) in streams.items():
+        for parca in split_lines(list(lines), parca_satir):
+            isler.append((station_code, (parca, station_code, wmo_id, ref_dt)))
+
+    parcalar = {station_code: [] for station_code in streams}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # map sırayı korur: parçalar akıştaki sırayla birleştirilir
+        for (station_code, _), df in zip(isler, executor.map(_parca_isle, [a for _, a in isler], chunksize=1)):
+            parcalar[station_code].append(df)
+
+    sonuc = {}
+    for station_code, dfs in parcalar.items():
+        if not dfs:
+            sonuc[station_code] = process_data([], station_code, streams[station_code][0], ref_dt)
+            continue
+        df = pd.concat(dfs, ignore_index=True)
+        for col in ("Türü", "İstasyon"):
+            df[col] = df[col].astype(object).astype("category")
+        # Parça sınırını aşan tekrarlar (İlk görülen kalır); sıralama process_data ile aynı girdi üzerinde yapılır
+        df = df.drop_duplicates(subset="_id").reset_index(drop=True)
+        if not df.empty:
+            df = df.sort_values(by="_dt", ascending=False)
+        sonuc[station_code] = add_date_column(df)
+    return sonuc
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+YEREL DÖKÜM AKTARIMI
+Diske kaydedilmiş Ogimet sayfalarını (display_metars2.php HTML) ve metin dökümlerini
+(display_synops2.php TXT veya <pre> içeriği) tarar, bültenleri RASATLAR.fetch ile aynı
+çıkarma mantığıyla ayırır ve bulten_arsivi veritabanına yükler.
+Dosyalar süreç havuzunda paralel ayrıştırılır, veritabanına tek yazıcıdan yazılır.
+
+Yalnızca 12 haneli zaman damgası (veya SYNOP virgüllü zaman alanları) taşıyan satırlar
+aktarılır; istasyon kodu her bültenin kendi metninden okunur.
+
+Kullanım:
+    python yerel_aktarim.py eski_incelemeler/
+    python yerel_aktarim.py dokumler/ --db kampanya.db --is-sayisi 4 --kapsam
+    python yerel_aktarim.py dokumler/ --istasyon LTFM     (Sadece bir istasyon)
+"""
+
+import io
+import os
+import re
+import sys
+import argparse
+import contextlib
+from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+
+import RASATLAR
+import bulten_arsivi
+
+HTML_UZANTILARI = (".html", ".htm")
+METIN_UZANTILARI = (".txt",)
+
+_RE_CHARSET = re.compile(rb'charset=["\']?([A-Za-z0-9_\-]+)', re.I)
+_ATLANAN_KELIMELER = ("AMD", "COR", "RTD", "CNL", "NIL")
+# Aynı dökümde bültenler arasında bundan uzun boşluk varsa kapsam orada bölünür
+KAPSAM_BOSLUK = timedelta(hours=24)
+
+def dosyalari_bul(dizin):
+    """Dizin ağacındaki HTML/TXT dökümlerinin yollarını (sıralı) döner."""
+    yollar = []
+    for kok, _, adlar in os.walk(dizin):
+        for ad in adlar:
+            if ad.lower().endswith(HTML_UZANTILARI + METIN_UZANTILARI):
+                yollar.append(os.path.join(kok, ad))
+    return sorted(yollar)
+
+def _kodlama(content):
+    """Sayfanın kendi bildirdiği karakter kodlamasını döner (Yoksa utf-8)."""
+    m = _RE_CHARSET.search(content[:4096])
+    return m.group(1).decode("ascii").lower() if m else "utf-8"
+
+def _istasyon_bul(satir):
+    """Bülten başlangıç satırından istasyon kodunu (ICAO veya SYNOP için WMO no) çıkarır."""
+    if "," in satir.split(None, 1)[0]:
+        wmo = satir.split(",", 1)[0]
+        return wmo if wmo.isdigit() else None
+    parts = satir.split()[1:] # Zaman damgası
+    if parts and parts[0] in ("METAR", "TAF", "SPECI"): parts = parts[1:]
+    for p in parts:
+        if p in _ATLANAN_KELIMELER: continue
+        return p if len(p) == 4 and p.isalpha() and p.isupper() else None
+    return None
+
+def kesintisiz_araliklar(zamanlar, bosluk=KAPSAM_BOSLUK):
+    """Bülten zamanlarını, aralarında bosluk'tan uzun ara olmayan (ilk, son) dilimlerine ayırır."""
+    araliklar = []
+    for dt in sorted(zamanlar):
+        if araliklar and dt - araliklar[-1][1] <= bosluk:
+            araliklar[-1][1] = dt
+        else:
+            araliklar.append([dt, dt])
+    return [tuple(a) for a in araliklar]
+
+def dosya_oku(yol):
+    """Tek dökümü okuyup {istasyon: [satırlar]} döner (Süreç havuzunda çalışır)."""
+    with open(yol, "rb") as f:
+        content = f.read()
+
+    with contextlib.redirect_stdout(io.StringIO()): # RASATLAR DEBUG çıktılarını sustur
+        if yol.lower().endswith(HTML_UZANTILARI):
+            lines = RASATLAR._parse_metar_page(content, _kodlama(content))
+        else:
+            lines = RASATLAR._parse_synop_text(content.decode(_kodlama(content), errors="replace"))
+
+    gruplar = {}
+    for dt, tur, satirlar in bulten_arsivi.bultenlere_ayir(lines):
+        istasyon = _istasyon_bul(satirlar[0])
+        if istasyon:
+            gruplar.setdefault(istasyon, []).extend(satirlar)
+    return gruplar
+
+def aktar(dizin, db_path=None, max_workers=None, istasyon=None, kapsam=False, on_progress=None):
+    """
+    Dizindeki dökümleri arşive yükler. {istasyon: bülten sayısı} döner.
+    kapsam=True ise her dökümde her ICAO istasyonunun kesintisiz bülten dilimleri (KAPSAM_BOSLUK)
+    "çekildi" olarak işaretlenir (bulten_arsivi.fetch bu aralıklar için Ogimet'e gitmez).
+    Farklı dönemlere ait dökümler arasındaki boşluk işaretlenmez.
+    """
+    yollar = dosyalari_bul(dizin)
+    sayilar, araliklar = {}, {}
+    if not yollar: return sayilar
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for i, gruplar in enumerate(executor.map(dosya_oku, yollar, chunksize=4), 1):
+            for ist, lines in gruplar.items():
+                if istasyon and ist != istasyon: continue
+                sayilar[ist] = sayilar.get(ist, 0) + bulten_arsivi.kaydet(ist, lines, db_path=db_path)
+                if kapsam and not ist.isdigit():
+                    zamanlar = [dt for dt, _, _ in bulten_arsivi.bultenlere_ayir(lines)]
+                    araliklar.setdefault(ist, []).extend(kesintisiz_araliklar(zamanlar))
+            if on_progress: on_progress(i, len(yollar))
+
+    for ist, dilimler in araliklar.items():
+        for a, b in dilimler:
+            bulten_arsivi.kaydet(ist, [], kapsam=(a, b), db_path=db_path)
+    return sayilar
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Kayıtlı Ogimet dökümlerini yerel bülten arşivine aktarır")
+    ap.add_argument("dizin")
+    ap.add_argument("--db", default=None, help="Arşiv dosyası (Varsayılan: ayarlar.ARSIV_DOSYASI)")
+    ap.add_argument("--is-sayisi", type=int, default=None, help="Paralel süreç sayısı (Varsayılan: çekirdek sayısı)")
+    ap.add_argument("--istasyon", default=None, help="Sadece bu istasyonu aktar")
+    ap.add_argument("--kapsam", action="store_true", help="Dökümlerin zaman aralığını çekildi olarak işaretle")
+    a = ap.parse_args()
+
+    if not os.path.isdir(a.dizin):
+        print(f"Dizin bulunamadı: {a.dizin}")
+        sys.exit(1)
+
+    def ilerleme(i, toplam):
+        print(f"\r{i}/{toplam} dosya", end="", flush=True)
+
+    sayilar = aktar(a.dizin, a.db, a.is_sayisi, a.istasyon, a.kapsam, on_progress=ilerleme)
+    print()
+    for ist in sorted(sayilar):
+        print(f"{ist}: {sayilar[ist]} bülten")
+    print(f"Toplam: {sum(sayilar.values())} bülten, {len(sayilar)} istasyon")
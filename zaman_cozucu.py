@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+zaman_cozucu.py
+DDHHMM(Z) zaman kodlarını (METAR saati, TAF/trend geçerlilik başı, FM grupları) referans
+tarihe en yakın aya yerleştiren ortak çözücü. Ayrıştırıcı (veri_isleme), analiz motoru
+(TAF_METAR_TREND) ve arayüzlerdeki FM grubu seçimi buradan çözer.
+
+İki yerleştirme kuralı vardır:
+  YERINE : datetime.replace gibi aynı takvim günü kurulur, geçersiz günler (31 Nisan, 24Z)
+           aday olmaz. Aday sırası (0, -1, +1) ay. Ayrıştırıcı ve FM grupları kullanır.
+  TASMA  : Ayın 1'inden gün/saat/dakika eklenir, 31 Nisan 1 Mayıs'a, 24Z ertesi güne taşar.
+           Aday sırası (-1, 0, +1) ay. Analiz motoru kullanır.
+Eşit uzaklıktaki adaylardan sıradaki ilki seçilir (min() davranışı).
+
+Tekil çağrılar (yil, ay, DDHHMM, kural) anahtarlı önbellekten aday listesi alır;
+en_yakin_dizi ise bütün diziyi NumPy ile tek seferde çözer.
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+YERINE, TASMA = "yerine", "tasma"
+_SIRALAR = {YERINE: (0, -1, 1), TASMA: (-1, 0, 1)}
+
+MEMO_SINIRI = 8192 # Aşılınca önbellek boşaltılır (Tipik arşivde birkaç yüz anahtar)
+_memo = {}
+
+def _ay(yil, ay, offset):
+    """(yil, ay) çiftini offset ay kaydırır."""
+    ay += offset
+    if ay < 1: return yil - 1, ay + 12
+    if ay > 12: return yil + 1, ay - 12
+    return yil, ay
+
+def tarih_kur(yil, ay, gun, saat, dakika=0, kural=TASMA):
+    """Tek aday kurar. YERINE kuralında geçersiz tarih için None döner."""
+    if kural == TASMA:
+        return datetime(yil, ay, 1) + timedelta(days=gun-1, hours=saat, minutes=dakika)
+    try: return datetime(yil, ay, gun, saat, dakika)
+    except ValueError: return None
+
+def adaylar(yil, ay, gun, saat, dakika, kural=YERINE):
+    """(yil, ay) referans ayı çevresindeki aday datetime'ları kural sırasıyla döner (Önbellekli)."""
+    key = (yil, ay, gun, saat, dakika, kural)
+    c = _memo.get(key)
+    if c is None:
+        c = []
+        for offset in _SIRALAR[kural]:
+            try: dt = tarih_kur(*_ay(yil, ay, offset), gun, saat, dakika, kural)
+            except (ValueError, OverflowError): continue # Takvim sınırı (Yıl 1 / 9999)
+            if dt is not None: c.append(dt)
+        c = tuple(c)
+        if len(_memo) >= MEMO_SINIRI: _memo.clear()
+        _memo[key] = c
+    return c
+
+def en_yakin(gun, saat, dakika, ref, kural=YERINE):
+    """DDHHMM zamanını ref tarihine en yakın aya yerleştirir. Aday yoksa None döner."""
+    en_iyi, en_az = None, None
+    for dt in adaylar(ref.year, ref.month, gun, saat, dakika, kural):
+        if ref.tzinfo is not None and kural == YERINE: dt = dt.replace(tzinfo=ref.tzinfo)
+        fark = abs(dt - ref)
+        if en_az is None or fark < en_az:
+            en_iyi, en_az = dt, fark
+    return en_iyi
+
+def en_yakin_dizi(gunler, saatler, dakikalar, refler, kural=YERINE):
+    """
+    en_yakin'in dizi hali: gün/saat/dakika dizilerini (veya skalerleri) ref dizisine göre
+    tek seferde çözer. datetime64[us] dizisi döner, çözülemeyen elemanlar NaT olur.
+    """
+    g, s, d = (np.asarray(x, dtype=np.int64) for x in (gunler, saatler, dakikalar))
+    ref = np.asarray(refler, dtype="datetime64[us]")
+    g, s, d, ref = np.broadcast_arrays(g, s, d, ref)
+
+    ref_ay = ref.astype("datetime64[M]")
+    fark_kod = ((g - 1) * 1440 + s * 60 + d).astype("timedelta64[m]")
+    sonuc = np.full(g.shape, np.datetime64("NaT"), dtype="datetime64[us]")
+    en_az = np.full(g.shape, np.iinfo(np.int64).max, dtype=np.int64)
+    gecerli_kod = ~np.isnat(ref)
+    if kural == YERINE:
+        gecerli_kod &= (g >= 1) & (s >= 0) & (s < 24) & (d >= 0) & (d < 60)
+
+    for offset in _SIRALAR[kural]:
+        ay_basi = ref_ay + offset
+        aday = ay_basi.astype("datetime64[us]") + fark_kod
+        gecerli = gecerli_kod
+        if kural == YERINE:
+            ay_uzunlugu = ((ay_basi + 1).astype("datetime64[D]") - ay_basi.astype("datetime64[D]")).astype(np.int64)
+            gecerli = gecerli & (g <= ay_uzunlugu)
+        fark = np.abs((aday - ref).astype(np.int64))
+        daha_iyi = gecerli & (fark < en_az) # Eşitlikte önceki aday kalır
+        sonuc[daha_iyi] = aday[daha_iyi]
+        en_az[daha_iyi] = fark[daha_iyi]
+    return sonuc